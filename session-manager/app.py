@@ -1,22 +1,96 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 import redis
+from redis.client import Pipeline
+from redis.cluster import ClusterPipeline, RedisCluster
+from redis.sentinel import Sentinel, SentinelConnectionPool, SentinelManagedConnection
 import uuid
 import os
 import yaml
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from pythonjsonlogger import jsonlogger
+import queue
+import random
+import copy
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
 import time
 import requests
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import hashlib
+import bisect
+import math
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Request threads only enqueue records; a background listener formats them as
+# JSON and writes them, so a slow stdout or a burst of logs never stalls a request
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))  # Fraction of hot-path INFO logs kept
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach request and session identifiers to every record"""
+    def filter(self, record):
+        if has_request_context():
+            if not hasattr(record, 'request_id'):
+                record.request_id = g.get('request_id')
+            if not hasattr(record, 'session_uuid'):
+                record.session_uuid = (request.view_args or {}).get('session_uuid')
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep LOG_SAMPLE_RATE of INFO/DEBUG records logged with extra={'sampled': True}"""
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not getattr(record, 'sampled', False):
+            return True
+        return random.random() < LOG_SAMPLE_RATE
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only resolve args and tracebacks here; JSON formatting happens on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+log_handler = NonBlockingQueueHandler(log_queue)
+log_handler.addFilter(SamplingFilter())
+log_handler.addFilter(RequestContextFilter())
+
+log_output = logging.StreamHandler()
+log_output.setFormatter(jsonlogger.JsonFormatter(
+    '%(asctime)s %(name)s %(levelname)s %(message)s %(request_id)s %(session_uuid)s'
+))
+log_listener = QueueListener(log_queue, log_output, respect_handler_level=True)
+
+logging.basicConfig(level=LOG_LEVEL, handlers=[log_handler])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -26,11 +100,81 @@ REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
 REDIS_PORT_STR = os.getenv('REDIS_PORT', '6379')
 REDIS_PORT = int(REDIS_PORT_STR.split(':')[-1]) if 'tcp://' in REDIS_PORT_STR else int(REDIS_PORT_STR)
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
+REDIS_MODE = os.getenv('REDIS_MODE', 'standalone').lower()  # standalone | sentinel | cluster
+REDIS_SENTINELS = [
+    (host, int(port)) for host, port in
+    (s.strip().rsplit(':', 1) for s in os.getenv('REDIS_SENTINELS', '').split(',') if s.strip())
+]  # host:port,... (sentinel mode)
+REDIS_SENTINEL_MASTER = os.getenv('REDIS_SENTINEL_MASTER', 'mymaster')
+REDIS_SENTINEL_PASSWORD = os.getenv('REDIS_SENTINEL_PASSWORD') or None  # Sentinels' own requirepass (usually none)
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 20))  # Per worker process
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 2))  # Wait for a free pooled connection
 SESSION_TTL = int(os.getenv('SESSION_TTL', 86400))  # 24 hours default
 USER_POD_IMAGE = os.getenv('USER_POD_IMAGE', 'us-central1-docker.pkg.dev/hyperbola-476507/docker-repo/ai-environment:latest')
 USER_POD_PORT = int(os.getenv('USER_POD_PORT', 8080))
 API_KEY = os.getenv('API_KEY', 'change-this-in-production')  # API authentication
-VERSION = '3.1.2'  # CRITICAL FIX: Mount PVC to /app instead of /workspace for data persistence
+# Namespaces that user workspaces are sharded across (comma-separated)
+WORKSPACE_NAMESPACES = [ns.strip() for ns in os.getenv('WORKSPACE_NAMESPACES', 'default').split(',') if ns.strip()]
+HASH_RING_VNODES = int(os.getenv('HASH_RING_VNODES', 64))  # Virtual nodes per namespace on the hash ring
+LEGACY_NAMESPACE = 'default'  # Sessions created before sharding have no namespace recorded
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0.05))  # Fraction of traces exported (Server-Timing is always sent)
+OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')  # e.g. http://otel-collector:4318 (OTLP/HTTP JSON)
+TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE')  # Append OTLP/JSON batches to this file, one per line
+TRACE_QUEUE_SIZE = int(os.getenv('TRACE_QUEUE_SIZE', 2000))
+TRACE_EXPORT_INTERVAL = float(os.getenv('TRACE_EXPORT_INTERVAL', 5))
+DELIVERY_WORKER_ENABLED = os.getenv('DELIVERY_WORKER_ENABLED', 'true').lower() == 'true'
+DELIVERY_INTERVAL = float(os.getenv('DELIVERY_INTERVAL', 2))  # Seconds between queue sweeps
+DELIVERY_BATCH_SIZE = int(os.getenv('DELIVERY_BATCH_SIZE', 20))  # Max messages per session per sweep
+DELIVERY_MAX_ATTEMPTS = int(os.getenv('DELIVERY_MAX_ATTEMPTS', 5))  # Before a message is dead-lettered
+WORKER_ID = f"{os.getenv('HOSTNAME', 'local')}-{os.getpid()}"
+KEDA_SCALER_ENABLED = os.getenv('KEDA_SCALER_ENABLED', 'false').lower() == 'true'  # Per-session ScaledObjects backed by keda_scaler.py
+KEDA_SCALER_ADDRESS = os.getenv('KEDA_SCALER_ADDRESS', 'session-manager-scaler.default.svc.cluster.local:9090')
+SCALE_IDLE_SECONDS = int(os.getenv('SCALE_IDLE_SECONDS', 900))  # Idle time before a pod may scale to zero
+SCALER_COOLDOWN = int(os.getenv('SCALER_COOLDOWN', 120))  # KEDA cooldownPeriod for user pods
+# Committed capacity budget for user workspaces (0 = unlimited)
+ADMISSION_BUDGET = {
+    'pods': int(os.getenv('ADMISSION_MAX_PODS', 0)),
+    'cpu_m': int(os.getenv('ADMISSION_MAX_CPU_M', 0)),
+    'memory_mi': int(os.getenv('ADMISSION_MAX_MEMORY_MI', 0)),
+    'storage_gi': int(os.getenv('ADMISSION_MAX_STORAGE_GI', 0)),
+}
+ADMISSION_INTERVAL = float(os.getenv('ADMISSION_INTERVAL', 2))  # Seconds between queue admission sweeps
+ADMISSION_WORKER_ENABLED = os.getenv('ADMISSION_WORKER_ENABLED', 'true').lower() == 'true'  # Admits queued creates
+ADMISSION_WAIT_PER_SLOT = float(os.getenv('ADMISSION_WAIT_PER_SLOT', 30))  # Initial wait estimate per queue position
+MIGRATION_WORKER_ENABLED = os.getenv('MIGRATION_WORKER_ENABLED', 'true').lower() == 'true'  # Runs queued namespace moves
+MIGRATION_INTERVAL = float(os.getenv('MIGRATION_INTERVAL', 5))  # Seconds between migration steps
+MIGRATION_CONCURRENCY = int(os.getenv('MIGRATION_CONCURRENCY', 5))  # Session moves advanced per tick
+RECONCILE_ENABLED = os.getenv('RECONCILE_ENABLED', 'true').lower() == 'true'
+RECONCILE_INTERVAL = float(os.getenv('RECONCILE_INTERVAL', 300))  # Seconds between drift sweeps
+RECONCILE_POLL_INTERVAL = float(os.getenv('RECONCILE_POLL_INTERVAL', 5))  # Seconds between checks for requested sweeps
+RECONCILE_GRACE_SECONDS = int(os.getenv('RECONCILE_GRACE_SECONDS', 600))  # Never collect objects younger than this
+RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', 50))  # Max orphan deletions per sweep
+RECONCILE_DELETE_INTERVAL = float(os.getenv('RECONCILE_DELETE_INTERVAL', 0.2))  # Pause between deletions
+RECONCILE_MAX_ORPHAN_RATIO = float(os.getenv('RECONCILE_MAX_ORPHAN_RATIO', 0.5))  # Halt deletes above this orphan share
+STORAGE_WORKER_ENABLED = os.getenv('STORAGE_WORKER_ENABLED', 'true').lower() == 'true'  # Runs archive/restore jobs
+HIBERNATION_ENABLED = os.getenv('HIBERNATION_ENABLED', 'true').lower() == 'true'  # Archive idle workspaces
+HIBERNATE_AFTER_SECONDS = int(os.getenv('HIBERNATE_AFTER_SECONDS', 21600))  # Idle time before a workspace is archived
+STORAGE_INTERVAL = float(os.getenv('STORAGE_INTERVAL', 15))  # Seconds between archive/restore job checks
+HIBERNATE_SCAN_INTERVAL = float(os.getenv('HIBERNATE_SCAN_INTERVAL', 300))  # Seconds between idle-session scans
+ARCHIVE_PRUNE_INTERVAL = float(os.getenv('ARCHIVE_PRUNE_INTERVAL', 21600))  # Seconds between sweeps for unowned archives
+RESTORE_MAX_ATTEMPTS = int(os.getenv('RESTORE_MAX_ATTEMPTS', 5))  # Failed restores retried before waiting for a wake
+GOLDEN_MODE = os.getenv('GOLDEN_MODE', 'off').lower()  # off | snapshot | pvc - where new workspace PVCs are cloned from
+GOLDEN_SOURCE_PVC = os.getenv('GOLDEN_SOURCE_PVC', 'golden-workspace')  # Pre-populated /app PVC in every workspace namespace
+GOLDEN_SNAPSHOT_CLASS = os.getenv('GOLDEN_SNAPSHOT_CLASS')  # VolumeSnapshotClass (cluster default when unset)
+GOLDEN_KEEP_VERSIONS = int(os.getenv('GOLDEN_KEEP_VERSIONS', 2))  # Snapshot versions kept for PVCs still provisioning
+READY_TRACKER_ENABLED = os.getenv('READY_TRACKER_ENABLED', 'true').lower() == 'true'  # Time-to-ready + golden promotion
+READY_TRACK_INTERVAL = float(os.getenv('READY_TRACK_INTERVAL', 5))  # Seconds between time-to-ready checks
+READY_TRACK_TIMEOUT = int(os.getenv('READY_TRACK_TIMEOUT', 3600))  # Give up on sessions that never became ready
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))  # Consecutive failures that open a breaker
+BREAKER_RECOVERY_SECONDS = float(os.getenv('BREAKER_RECOVERY_SECONDS', 15))  # Open time before a half-open probe
+POD_BREAKER_FAILURES = int(os.getenv('POD_BREAKER_FAILURES', 3))  # Per user pod; pods fail alone
+POD_BREAKERS_MAX = int(os.getenv('POD_BREAKERS_MAX', 1000))  # Per-pod breakers kept in memory
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', 25))  # Per-request budget, under gunicorn's 30s
+K8S_TIMEOUT = float(os.getenv('K8S_TIMEOUT', 10))  # Read timeout per Kubernetes API call
+K8S_CONNECT_TIMEOUT = float(os.getenv('K8S_CONNECT_TIMEOUT', 3))
+REDIS_TIMEOUT = float(os.getenv('REDIS_TIMEOUT', 2))  # Socket timeout per Redis command
+POD_TIMEOUT = float(os.getenv('POD_TIMEOUT', 5))  # Per message forwarded to a user pod
+VERSION = '3.12.0'  # Pooled Sentinel/Cluster-ready Redis client and hash-tagged keyspace
 
 # Load k8s config
 try:
@@ -40,35 +184,690 @@ except:
     config.load_kube_config()
     logger.info("Loaded local Kubernetes config")
 
-v1 = client.AppsV1Api()
-core_v1 = client.CoreV1Api()
-custom_api = client.CustomObjectsApi()
 
-# Initialize Redis with error handling
-def init_redis():
-    """Initialize Redis connection with validation"""
+# ============================================================================
+# TRACING - Per-request spans, Server-Timing header and OTLP export
+# ============================================================================
+
+class Trace:
+    """Spans collected for one request (or one background job)"""
+    def __init__(self, trace_id=None, parent_span_id=None, sampled=False):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.sampled = sampled
+        self.spans = []
+        self.stack = [parent_span_id]
+
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+@contextmanager
+def trace_span(name, kind='internal', **attributes):
+    """Time a block as a child of the current span; no-op outside a trace"""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    
+    span = {
+        'name': name,
+        'kind': kind,
+        'span_id': os.urandom(8).hex(),
+        'parent_span_id': trace.stack[-1],
+        'start': time.time_ns(),
+        'attributes': attributes,
+        'error': None
+    }
+    trace.stack.append(span['span_id'])
     try:
-        r = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            password=REDIS_PASSWORD,
-            decode_responses=True,
-            socket_connect_timeout=5,
-            socket_keepalive=True,
-            health_check_interval=30
-        )
-        r.ping()
-        logger.info(f"✅ Redis connected successfully at {REDIS_HOST}:{REDIS_PORT}")
-        return r
+        yield span
     except Exception as e:
-        logger.error(f"❌ Failed to connect to Redis: {str(e)}")
+        span['error'] = str(e)
         raise
+    finally:
+        trace.stack.pop()
+        span['end'] = time.time_ns()
+        trace.spans.append(span)
+
+
+def traceparent_header():
+    """W3C traceparent for propagating the current span to user pods"""
+    trace = current_trace.get()
+    if trace is None or trace.stack[-1] is None:
+        return {}
+    return {'traceparent': f"00-{trace.trace_id}-{trace.stack[-1]}-{'01' if trace.sampled else '00'}"}
+
+
+def server_timing(trace, max_entries=30):
+    """Render finished spans as a Server-Timing header value"""
+    entries = []
+    for span in trace.spans[-max_entries:]:
+        duration_ms = (span['end'] - span['start']) / 1e6
+        # Metric names must be HTTP tokens, so the request span is reported as "total"
+        name = 'total' if span['kind'] == 'server' else span['name']
+        entries.append(f"{name};dur={duration_ms:.1f}")
+    return ', '.join(entries)
+
+
+def otlp_attributes(attributes):
+    return [{'key': k, 'value': {'stringValue': str(v)}} for k, v in attributes.items()]
+
+
+def otlp_payload(traces):
+    """Convert finished traces to an OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for trace in traces:
+        for span in trace.spans:
+            otlp_span = {
+                'traceId': trace.trace_id,
+                'spanId': span['span_id'],
+                'name': span['name'],
+                'kind': {'internal': 1, 'server': 2, 'client': 3}[span['kind']],
+                'startTimeUnixNano': str(span['start']),
+                'endTimeUnixNano': str(span['end']),
+                'attributes': otlp_attributes(span['attributes']),
+                'status': {'code': 2, 'message': span['error']} if span['error'] else {'code': 1}
+            }
+            if span['parent_span_id']:
+                otlp_span['parentSpanId'] = span['parent_span_id']
+            spans.append(otlp_span)
+    
+    return {'resourceSpans': [{
+        'resource': {'attributes': otlp_attributes({'service.name': 'session-manager', 'service.version': VERSION})},
+        'scopeSpans': [{'scope': {'name': 'session-manager'}, 'spans': spans}]
+    }]}
+
+
+trace_queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+traces_dropped = 0
+
+
+def submit_trace(trace):
+    """Queue a sampled trace for export without blocking the caller"""
+    global traces_dropped
+    if not trace.sampled or not (OTLP_ENDPOINT or TRACE_EXPORT_FILE):
+        return
+    try:
+        trace_queue.put_nowait(trace)
+    except queue.Full:
+        traces_dropped += 1
+
+
+def export_traces():
+    """Background loop batching queued traces to the collector and/or file"""
+    while True:
+        time.sleep(TRACE_EXPORT_INTERVAL)
+        batch = []
+        while len(batch) < 500:
+            try:
+                batch.append(trace_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            continue
+        
+        payload = otlp_payload(batch)
+        if OTLP_ENDPOINT:
+            try:
+                requests.post(f"{OTLP_ENDPOINT.rstrip('/')}/v1/traces", json=payload, timeout=5)
+            except Exception as e:
+                logger.warning(f"Trace export failed: {str(e)}")
+        if TRACE_EXPORT_FILE:
+            try:
+                with open(TRACE_EXPORT_FILE, 'a') as f:
+                    f.write(json.dumps(payload) + '\n')
+            except Exception as e:
+                logger.warning(f"Trace file export failed: {str(e)}")
+
+
+if OTLP_ENDPOINT or TRACE_EXPORT_FILE:
+    threading.Thread(target=export_traces, name='trace-exporter', daemon=True).start()
+
+
+def is_hex(value, length):
+    return len(value) == length and all(c in '0123456789abcdef' for c in value)
+
+
+def parse_traceparent(header):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent, or None if malformed"""
+    parts = header.strip().split('-')
+    if len(parts) < 4 or not is_hex(parts[0], 2) or parts[0] == 'ff':
+        return None
+    version, trace_id, parent_span_id, flags = parts[:4]
+    if version == '00' and len(parts) != 4:
+        return None
+    if not is_hex(trace_id, 32) or not is_hex(parent_span_id, 16) or not is_hex(flags, 2):
+        return None
+    if trace_id == '0' * 32 or parent_span_id == '0' * 16:
+        return None
+    return trace_id, parent_span_id, bool(int(flags, 16) & 1)
+
+
+@app.before_request
+def start_request_trace():
+    """Start a trace for the request, continuing an incoming traceparent"""
+    trace_id, parent_span_id, sampled = None, None, random.random() < TRACE_SAMPLE_RATE
+    incoming = parse_traceparent(request.headers.get('traceparent', ''))
+    if incoming:
+        trace_id, parent_span_id, sampled = incoming
+    
+    trace = Trace(trace_id, parent_span_id, sampled)
+    g.trace_token = current_trace.set(trace)
+    g.trace_root = trace_span(f"{request.method} {request.path}", kind='server')
+    g.trace_root.__enter__()
+
+
+@app.after_request
+def finish_request_trace(response):
+    trace = current_trace.get()
+    if trace is None or 'trace_root' not in g:
+        return response
+    
+    g.pop('trace_root').__exit__(None, None, None)
+    root = trace.spans[-1]
+    root['name'] = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+    root['attributes']['http.status_code'] = response.status_code
+    
+    # Child spans in completion order, request total last
+    response.headers['Server-Timing'] = server_timing(trace)
+    submit_trace(trace)
+    return response
+
+
+@app.teardown_request
+def reset_request_trace(exc):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        current_trace.reset(token)
+
+
+# ============================================================================
+# DEPENDENCY GUARDS - Circuit breakers and request deadlines
+# ============================================================================
+# Every outbound call (Kubernetes, Redis, user pods) goes through a breaker:
+# after consecutive failures it opens and calls fail fast with a 503 until a
+# single half-open probe succeeds. Requests carry a deadline that caps each
+# call's timeout, so a slow dependency can't hold a sync worker past it.
+# Breakers are per process, like the connections they guard.
+
+class DependencyUnavailable(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+    def __init__(self, dependency, retry_after):
+        super().__init__(f"{dependency} unavailable (circuit open, retry in {retry_after}s)")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a call the request has no time left for"""
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half-open (one probe) -> closed"""
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, recovery_seconds=BREAKER_RECOVERY_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return
+            wait = self.opened_at + self.recovery_seconds - time.monotonic()
+            if self.state == 'open' and wait <= 0:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True  # This caller is the probe
+                return
+            self.rejected += 1
+            raise DependencyUnavailable(self.name, max(1, math.ceil(wait)))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info(f"✅ Circuit closed: {self.name}")
+            self.state, self.failures, self.probing = 'closed', 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                logger.error(f"🔌 Circuit opened: {self.name} after {self.failures} consecutive failures")
+
+    @contextmanager
+    def guard(self, is_failure):
+        """Run a call through the breaker; is_failure(exc) decides what counts against it"""
+        self.allow()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def available(self):
+        """Would a call get through right now (without claiming the half-open probe)"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            return not self.probing and time.monotonic() >= self.opened_at + self.recovery_seconds
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected
+        }
+
+
+breakers = {
+    'kubernetes': CircuitBreaker('kubernetes'),
+    'redis': CircuitBreaker('redis')
+}
+pod_breakers = {}
+pod_breakers_lock = threading.Lock()
+retired_pod_trips = 0
+
+
+def pod_breaker(session_uuid):
+    """Each user pod gets its own breaker so one stuck pod doesn't block the others"""
+    global retired_pod_trips
+    with pod_breakers_lock:
+        breaker = pod_breakers.get(session_uuid)
+        if breaker is None:
+            if len(pod_breakers) >= POD_BREAKERS_MAX:
+                # Forget healthy pods first, then the oldest
+                for key in [k for k, b in pod_breakers.items() if b.state == 'closed'] or [next(iter(pod_breakers))]:
+                    retired_pod_trips += pod_breakers.pop(key).trips
+            breaker = pod_breakers[session_uuid] = CircuitBreaker(f"pod:{session_uuid}", POD_BREAKER_FAILURES)
+        return breaker
+
+
+def k8s_failure(e):
+    # 404/409 and friends are answers, not outages; throttling and 5xx are
+    return not isinstance(e, ApiException) or e.status == 429 or (e.status or 500) >= 500
+
+
+def redis_failure(e):
+    return isinstance(e, (redis.ConnectionError, redis.TimeoutError))
+
+
+def pod_failure(e):
+    if isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    return isinstance(e, requests.RequestException)
+
+
+def breaker_report():
+    with pod_breakers_lock:
+        pods = list(pod_breakers.values())
+    open_pods = [b.name.split(':', 1)[1] for b in pods if b.state != 'closed']
+    return {
+        'worker': WORKER_ID,
+        'dependencies': {name: breaker.snapshot() for name, breaker in breakers.items()},
+        'pods': {
+            'tracked': len(pods),
+            'open': len(open_pods),
+            'open_sessions': open_pods[:20],
+            'trips': retired_pod_trips + sum(b.trips for b in pods)
+        }
+    }
+
+
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+
+def time_left():
+    """Seconds left in the current request's budget (None outside requests)"""
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def call_timeout(dependency, default):
+    """Timeout for the next call: the dependency's default, capped by the request deadline"""
+    left = time_left()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded before calling {dependency}")
+    return min(default, left)
+
+
+@app.before_request
+def start_request_deadline():
+    """Budget the request; callers may ask for less with X-Request-Timeout (seconds)"""
+    budget = REQUEST_DEADLINE_SECONDS
+    try:
+        requested = float(request.headers.get('X-Request-Timeout', budget))
+        if requested > 0:  # Zero, negative or NaN would fail every call; ignore them
+            budget = min(budget, requested)
+    except ValueError:
+        pass
+    g.deadline_token = current_deadline.set(time.monotonic() + budget)
+
+
+@app.teardown_request
+def reset_request_deadline(exc):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        current_deadline.reset(token)
+
+
+class TracedApiClient(client.ApiClient):
+    """Kubernetes API client with a span, the kubernetes breaker and a deadline-capped timeout per call"""
+    def call_api(self, resource_path, method, *args, **kwargs):
+        # e.g. /apis/apps/v1/namespaces/{namespace}/deployments/{name} -> deployments
+        resource = [p for p in resource_path.split('/') if p and not p.startswith('{')][-1]
+        if kwargs.get('_request_timeout') is None:
+            timeout = call_timeout('kubernetes', K8S_TIMEOUT)
+            kwargs['_request_timeout'] = (min(K8S_CONNECT_TIMEOUT, timeout), timeout)
+        with breakers['kubernetes'].guard(k8s_failure), \
+                trace_span(f"k8s.{method.lower()}.{resource}", kind='client', path=resource_path):
+            return super().call_api(resource_path, method, *args, **kwargs)
+
+
+class DeadlineConnectionMixin:
+    """Redis socket timeout capped by the request deadline, re-applied before every send and read"""
+    def cap_socket_timeout(self):
+        left = time_left()
+        if self._sock is not None:
+            self._sock.settimeout(self.socket_timeout if left is None else max(min(self.socket_timeout, left), 0.001))
+    
+    def send_packed_command(self, command, check_health=True):
+        if not self._sock:
+            self.connect()
+        self.cap_socket_timeout()
+        return super().send_packed_command(command, check_health)
+    
+    def read_response(self, *args, **kwargs):
+        self.cap_socket_timeout()
+        return super().read_response(*args, **kwargs)
+
+
+class DeadlineConnection(DeadlineConnectionMixin, redis.Connection):
+    pass
+
+
+class DeadlineSentinelManagedConnection(DeadlineConnectionMixin, SentinelManagedConnection):
+    pass
+
+
+class GuardedPipeline:
+    """Span and the redis breaker around a pipeline's one round trip"""
+    def execute(self, raise_on_error=True):
+        call_timeout('redis', REDIS_TIMEOUT)  # Fail fast; the connection caps each read to the time left
+        with breakers['redis'].guard(redis_failure), \
+                trace_span('redis.pipeline', kind='client', commands=len(self.command_stack)):
+            return super().execute(raise_on_error)
+
+
+class TracedPipeline(GuardedPipeline, Pipeline):
+    pass
+
+
+class TracedClusterPipeline(GuardedPipeline, ClusterPipeline):
+    pass
+
+
+class GuardedRedisCommands:
+    """Span and the redis breaker per command, for any redis-py client class"""
+    pipeline_class = None
+    
+    def execute_command(self, *args, **options):
+        call_timeout('redis', REDIS_TIMEOUT)  # Fail fast; the connection caps each read to the time left
+        with breakers['redis'].guard(redis_failure), \
+                trace_span(f"redis.{str(args[0]).lower()}", kind='client'):
+            return super().execute_command(*args, **options)
+    
+    def pipeline(self, *args, **kwargs):
+        # Queued commands bypass execute_command; guard the execute() that sends them.
+        # Same object redis-py builds, so its constructor arguments stay redis-py's business.
+        pipe = super().pipeline(*args, **kwargs)
+        pipe.__class__ = self.pipeline_class
+        return pipe
+
+
+class TracedRedis(GuardedRedisCommands, redis.Redis):
+    """Standalone or Sentinel-managed Redis"""
+    pipeline_class = TracedPipeline
 
+
+class TracedRedisCluster(GuardedRedisCommands, RedisCluster):
+    """Redis Cluster; routes each command to the node owning its key's slot"""
+    pipeline_class = TracedClusterPipeline
+
+
+class BlockingSentinelConnectionPool(SentinelConnectionPool, redis.BlockingConnectionPool):
+    """Sentinel master discovery with a bounded pool that waits for a free connection"""
+
+
+# Retry once on connection errors; more would multiply the bounded timeout
+k8s_configuration = client.Configuration.get_default_copy()
+k8s_configuration.retries = 1
+k8s_api_client = TracedApiClient(k8s_configuration)
+v1 = client.AppsV1Api(k8s_api_client)
+core_v1 = client.CoreV1Api(k8s_api_client)
+networking_v1 = client.NetworkingV1Api(k8s_api_client)
+batch_v1 = client.BatchV1Api(k8s_api_client)
+custom_api = client.CustomObjectsApi(k8s_api_client)
+
+
+# ============================================================================
+# REDIS - Pooled per-process client and hash-tagged keyspace
+# ============================================================================
+
+def connect_redis():
+    """Client for REDIS_MODE with a bounded pool; connections reconnect on demand"""
+    options = {
+        'password': REDIS_PASSWORD,
+        'decode_responses': True,
+        'socket_connect_timeout': REDIS_TIMEOUT,
+        'socket_timeout': REDIS_TIMEOUT,
+        'socket_keepalive': True,
+        'health_check_interval': 30
+    }
+    if REDIS_MODE == 'cluster':
+        return TracedRedisCluster(
+            host=REDIS_HOST, port=REDIS_PORT, max_connections=REDIS_MAX_CONNECTIONS,
+            connection_class=DeadlineConnection, **options
+        )
+    if REDIS_MODE == 'sentinel':
+        sentinel = Sentinel(
+            REDIS_SENTINELS,
+            socket_timeout=REDIS_TIMEOUT,
+            sentinel_kwargs={'password': REDIS_SENTINEL_PASSWORD, 'socket_timeout': REDIS_TIMEOUT}
+        )
+        # The pool re-resolves the master through the sentinels after a failover
+        return sentinel.master_for(
+            REDIS_SENTINEL_MASTER,
+            redis_class=TracedRedis,
+            connection_pool_class=BlockingSentinelConnectionPool,
+            connection_class=DeadlineSentinelManagedConnection,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            **options
+        )
+    return TracedRedis(connection_pool=redis.BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        connection_class=DeadlineConnection,
+        **options
+    ))
+
+
+class RedisHandle:
+    """Module-level `r`: builds the client on first use in each process.
+    
+    Gunicorn workers therefore never share a pool (or sockets) inherited
+    across fork, and a Redis outage at startup no longer disables Redis for
+    the life of the process. `if not r` is true only while the redis breaker
+    is open, so endpoints keep failing fast with 503 until a probe succeeds.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = connect_redis()
+                    self._pid = os.getpid()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __bool__(self):
+        return breakers['redis'].available()
+
+
+r = RedisHandle()
 try:
-    r = init_redis()
+    r.ping()
+    logger.info(f"✅ Redis connected successfully at {REDIS_HOST}:{REDIS_PORT} ({REDIS_MODE})")
 except Exception as e:
-    logger.error(f"Redis initialization failed: {str(e)}")
-    r = None
+    logger.error(f"❌ Redis not reachable yet, will retry on demand: {str(e)}")
+
+
+# One session's keys share its {uuid} hash tag (session:{ab12cd34}, queue:{ab12cd34}, ...)
+# so per-session pipelines, multi-key deletes and scripts stay on a single cluster slot
+SESSION_KEY_KINDS = ['session', 'queue', 'processing', 'dlq', 'replies', 'chat', 'events']
+
+
+def session_key(session_uuid, kind='session'):
+    return f"{kind}:{{{session_uuid}}}"
+
+
+def session_keys(session_uuid):
+    return [session_key(session_uuid, kind) for kind in SESSION_KEY_KINDS]
+
+
+def uuid_from_key(key):
+    """session:{ab12cd34} -> ab12cd34"""
+    return key[key.index('{') + 1:key.index('}')]
+
+
+def iter_session_keys():
+    """Every session hash via SCAN (across all primaries in cluster mode), never KEYS"""
+    return r.scan_iter(match='session:{*}', count=1000)
+
+
+KEYSPACE_VERSION = 2  # 2: {uuid}, {admission} and {golden} hash tags
+
+
+def migrate_keyspace():
+    """Rename keys written before hash tags (session:ab12cd34 -> session:{ab12cd34}, ...)"""
+    if REDIS_MODE == 'cluster' or int(r.get('keyspace:version') or 1) >= KEYSPACE_VERSION:
+        return  # RENAME can't cross slots; migrate on the single node before moving to a cluster
+    if not r.set('keyspace-lock', WORKER_ID, nx=True, ex=600):
+        return
+    try:
+        moved = 0
+        for kind in SESSION_KEY_KINDS:
+            for key in list(r.scan_iter(match=f'{kind}:*', count=1000)):
+                if '{' not in key:
+                    moved += r.renamenx(key, session_key(key.split(':', 1)[1], kind))
+                    if kind == 'queue':
+                        # Before durable delivery the queue only held 'chat' markers for KEDA
+                        r.lrem(session_key(key.split(':', 1)[1], kind), 0, 'chat')
+        
+        # Reservations move out of the session hashes into {admission}:reserved
+        fields = [f'reserved_{k}' for k in RESOURCE_KEYS]
+        for key in list(iter_session_keys()):
+            held = {k: int(v or 0) for k, v in zip(RESOURCE_KEYS, r.hmget(key, fields))}
+            if any(held.values()):
+                r.hset(ADMISSION_RESERVED, uuid_from_key(key), json.dumps({**held, 'at': time.time()}))
+            r.hdel(key, *fields)
+        
+        renames = {
+            'admission:committed': ADMISSION_COMMITTED,
+            'admission:users': ADMISSION_USERS,
+            'admission:users:set': ADMISSION_USERS_SET,
+            'admission:queued': ADMISSION_QUEUED,
+            'golden:seq': GOLDEN_SEQ,
+            'golden:current': GOLDEN_CURRENT,
+            'golden:pending': GOLDEN_PENDING
+        }
+        for key in list(r.scan_iter(match='admission:user:*', count=1000)):
+            renames[key] = ADMISSION_USER_PREFIX + key[len('admission:user:'):]
+        for key in list(r.scan_iter(match='golden:version:*', count=1000)):
+            renames[key] = golden_version_key(key[len('golden:version:'):])
+        for old, new in renames.items():
+            if r.exists(old):
+                moved += r.renamenx(old, new)
+        
+        r.set('keyspace:version', KEYSPACE_VERSION)
+        logger.info(f"🔑 Keyspace migrated to v{KEYSPACE_VERSION}: {moved} keys renamed")
+    finally:
+        if r.get('keyspace-lock') == WORKER_ID:
+            r.delete('keyspace-lock')
+
+
+# ============================================================================
+# NAMESPACE SHARDING - Consistent hashing of sessions onto namespaces
+# ============================================================================
+
+class HashRing:
+    """Consistent hash ring mapping session UUIDs to workspace namespaces"""
+
+    def __init__(self, nodes, vnodes=HASH_RING_VNODES):
+        self.vnodes = vnodes
+        self.nodes = []
+        self._ring = {}
+        self._keys = []
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key):
+        return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+    def add_node(self, node):
+        """Add a namespace to the ring (only ~1/N of keys move to it)"""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            point = self._hash(f"{node}#{i}")
+            self._ring[point] = node
+            bisect.insort(self._keys, point)
+
+    def get_node(self, key):
+        """Return the namespace owning this key"""
+        if not self._keys:
+            raise ValueError("No workspace namespaces configured")
+        idx = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._ring[self._keys[idx]]
+
+
+namespace_ring = HashRing(WORKSPACE_NAMESPACES)
+logger.info(f"🧭 Workspace namespaces: {', '.join(WORKSPACE_NAMESPACES)}")
+
+
+def session_namespace(session_data):
+    """Namespace a session's Kubernetes objects live in"""
+    return session_data.get('namespace') or LEGACY_NAMESPACE
 
 
 # ============================================================================
@@ -130,6 +929,12 @@ def handle_errors(f):
     def decorated_function(*args, **kwargs):
         try:
             return f(*args, **kwargs)
+        except DependencyUnavailable as e:
+            logger.warning(f"Failing fast: {str(e)}")
+            return {'error': str(e), 'dependency': e.dependency}, 503, {'Retry-After': str(e.retry_after)}
+        except DeadlineExceeded as e:
+            logger.warning(f"Deadline exceeded in {f.__name__}: {str(e)}")
+            return {'error': str(e)}, 504
         except ApiException as e:
             logger.error(f"Kubernetes API error: {str(e)}")
             return {'error': f'Kubernetes error: {e.reason}'}, 500
@@ -145,6 +950,18 @@ def handle_errors(f):
     return decorated_function
 
 
+@app.before_request
+def assign_request_id():
+    """Tag each request with an ID for log correlation"""
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+
+@app.after_request
+def return_request_id(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return response
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -158,9 +975,14 @@ def log_event(session_uuid, event_type, details=None):
                 'type': event_type,
                 'details': details or {}
             }
-            r.lpush(f"events:{session_uuid}", json.dumps(event))
-            r.ltrim(f"events:{session_uuid}", 0, 99)  # Keep last 100 events
-            logger.info(f"📝 [{session_uuid}] {event_type}: {details}")
+            pipe = r.pipeline(transaction=False)
+            pipe.lpush(session_key(session_uuid, 'events'), json.dumps(event))
+            pipe.ltrim(session_key(session_uuid, 'events'), 0, 99)  # Keep last 100 events
+            pipe.execute()
+            logger.info(
+                f"📝 [{session_uuid}] {event_type}",
+                extra={'sampled': True, 'session_uuid': session_uuid, 'event_type': event_type, 'details': details}
+            )
         except Exception as e:
             logger.warning(f"Failed to log event: {str(e)}")
 
@@ -170,264 +992,1622 @@ def check_session_exists(session_uuid):
     if not r:
         raise Exception("Redis unavailable")
     
-    if not r.exists(f'session:{session_uuid}'):
+    if not r.exists(session_key(session_uuid)):
         raise ValueError(f"Session {session_uuid} not found")
     
-    return r.hgetall(f'session:{session_uuid}')
+    return r.hgetall(session_key(session_uuid))
 
 
 def set_session_ttl(session_uuid):
     """Set TTL for session data"""
     if r:
         try:
-            r.expire(f'session:{session_uuid}', SESSION_TTL)
-            r.expire(f'queue:{session_uuid}', SESSION_TTL)
+            pipe = r.pipeline(transaction=False)
+            for kind in ['session', 'queue', 'processing', 'dlq', 'replies']:
+                pipe.expire(session_key(session_uuid, kind), SESSION_TTL)
+            pipe.execute()
         except Exception as e:
             logger.warning(f"Failed to set TTL for {session_uuid}: {str(e)}")
 
-@app.route('/session/create', methods=['POST'])
-@require_api_key
-@handle_errors
-@rate_limit(max_requests=100, window=60)
-def create_session():
-    """Create new session with dedicated pod resources"""
-    start_time = time.time()
-    
-    if not r:
-        return {'error': 'Redis unavailable'}, 503
-    
-    session_uuid = str(uuid.uuid4())[:8]
-    user_id = request.json.get('user_id')
-    
-    if not user_id:
-        raise ValueError("user_id is required")
-    
+def pod_resources(profile='default'):
+    """Container requests for a scale profile; limits are twice the requests"""
+    requests = POD_PROFILES[profile]
+    return client.V1ResourceRequirements(
+        requests={"memory": f"{requests['memory_mi']}Mi", "cpu": f"{requests['cpu_m']}m"},
+        limits={"memory": f"{requests['memory_mi'] * 2}Mi", "cpu": f"{requests['cpu_m'] * 2}m"}
+    )
+
+
+def build_user_deployment(session_uuid, user_id, replicas=1, profile='default'):
+    """Deployment running the user's workspace pod"""
     # Sanitize user_id for Kubernetes labels (alphanumeric, -, _, .)
     user_id_label = user_id.replace('@', '-').replace('/', '-').replace(':', '-')
     
-    logger.info(f"🆕 Creating session for user: {user_id}")
-    
-    try:
-        # Create deployment for this user
-        deployment = client.V1Deployment(
-            metadata=client.V1ObjectMeta(
-                name=f"user-{session_uuid}",
-                labels={"session-uuid": session_uuid, "user-id": user_id_label}
+    return client.V1Deployment(
+        metadata=client.V1ObjectMeta(
+            name=f"user-{session_uuid}",
+            labels={"session-uuid": session_uuid, "user-id": user_id_label}
+        ),
+        spec=client.V1DeploymentSpec(
+            replicas=replicas,
+            selector=client.V1LabelSelector(
+                match_labels={"app": f"user-{session_uuid}"}
             ),
-            spec=client.V1DeploymentSpec(
-                replicas=1,  # Start pod immediately
-                selector=client.V1LabelSelector(
-                    match_labels={"app": f"user-{session_uuid}"}
+            template=client.V1PodTemplateSpec(
+                metadata=client.V1ObjectMeta(
+                    labels={"app": f"user-{session_uuid}", "uuid": session_uuid, "user-id": user_id_label}
                 ),
-                template=client.V1PodTemplateSpec(
-                    metadata=client.V1ObjectMeta(
-                        labels={"app": f"user-{session_uuid}", "uuid": session_uuid, "user-id": user_id_label}
-                    ),
-                    spec=client.V1PodSpec(
-                        containers=[
-                            client.V1Container(
-                                name="user-pod",
-                                image=USER_POD_IMAGE,
-                                ports=[client.V1ContainerPort(container_port=USER_POD_PORT)],
-                                resources=client.V1ResourceRequirements(
-                                    requests={"memory": "256Mi", "cpu": "250m"},
-                                    limits={"memory": "512Mi", "cpu": "500m"}
-                                ),
-                                env=[
-                                    client.V1EnvVar(name="SESSION_UUID", value=session_uuid),
-                                    client.V1EnvVar(name="USER_ID", value=user_id)
-                                ],
-                                volume_mounts=[
-                                    client.V1VolumeMount(
-                                        name="user-data",
-                                        mount_path="/app"
-                                    )
-                                ]
-                            )
-                        ],
-                        volumes=[
-                            client.V1Volume(
-                                name="user-data",
-                                persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                                    claim_name=f"pvc-{session_uuid}"
+                spec=client.V1PodSpec(
+                    containers=[
+                        client.V1Container(
+                            name="user-pod",
+                            image=USER_POD_IMAGE,
+                            ports=[client.V1ContainerPort(container_port=USER_POD_PORT)],
+                            resources=pod_resources(profile),
+                            env=[
+                                client.V1EnvVar(name="SESSION_UUID", value=session_uuid),
+                                client.V1EnvVar(name="USER_ID", value=user_id)
+                            ],
+                            volume_mounts=[
+                                client.V1VolumeMount(
+                                    name="user-data",
+                                    mount_path="/app"
                                 )
+                            ]
+                        )
+                    ],
+                    volumes=[
+                        client.V1Volume(
+                            name="user-data",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name=f"pvc-{session_uuid}"
                             )
-                        ]
-                    )
+                        )
+                    ]
                 )
             )
         )
-        
-        # Create PVC for user data
-        pvc = client.V1PersistentVolumeClaim(
-            metadata=client.V1ObjectMeta(
-                name=f"pvc-{session_uuid}",
-                labels={"session-uuid": session_uuid}
+    )
+
+
+def build_user_pvc(session_uuid, volume_name=None, data_source=None):
+    """PVC holding the user's /app data (optionally bound to an existing PV or cloned from a golden source)"""
+    return client.V1PersistentVolumeClaim(
+        metadata=client.V1ObjectMeta(
+            name=f"pvc-{session_uuid}",
+            labels={"session-uuid": session_uuid}
+        ),
+        spec=client.V1PersistentVolumeClaimSpec(
+            access_modes=["ReadWriteOnce"],
+            resources=client.V1ResourceRequirements(
+                requests={"storage": "5Gi"}
             ),
-            spec=client.V1PersistentVolumeClaimSpec(
-                access_modes=["ReadWriteOnce"],
-                resources=client.V1ResourceRequirements(
-                    requests={"storage": "5Gi"}
-                )
-            )
+            volume_name=volume_name,
+            data_source=data_source
         )
-        
-        core_v1.create_namespaced_persistent_volume_claim(namespace="default", body=pvc)
-        logger.info(f"✅ PVC created: pvc-{session_uuid}")
-        
-        v1.create_namespaced_deployment(namespace="default", body=deployment)
-        logger.info(f"✅ Deployment created: user-{session_uuid}")
-        
-        # Create ClusterIP service (internal)
-        service = client.V1Service(
-            metadata=client.V1ObjectMeta(
-                name=f"user-{session_uuid}",
-                labels={"session-uuid": session_uuid}
-            ),
-            spec=client.V1ServiceSpec(
-                selector={"app": f"user-{session_uuid}"},
-                ports=[client.V1ServicePort(port=80, target_port=USER_POD_PORT)]
-            )
+    )
+
+
+def build_user_service(session_uuid):
+    """ClusterIP service (internal) in front of the user pod"""
+    return client.V1Service(
+        metadata=client.V1ObjectMeta(
+            name=f"user-{session_uuid}",
+            labels={"session-uuid": session_uuid}
+        ),
+        spec=client.V1ServiceSpec(
+            selector={"app": f"user-{session_uuid}"},
+            ports=[client.V1ServicePort(port=80, target_port=USER_POD_PORT)]
         )
-        
-        core_v1.create_namespaced_service(namespace="default", body=service)
-        logger.info(f"✅ Service created: user-{session_uuid}")
-        
-        # Create Ingress for external access via subdomain
-        ingress = client.V1Ingress(
-            metadata=client.V1ObjectMeta(
-                name=f"user-{session_uuid}",
-                labels={"session-uuid": session_uuid},
-                annotations={
-                    "kubernetes.io/ingress.class": "nginx",
-                    "cert-manager.io/cluster-issuer": "letsencrypt-prod"
-                }
-            ),
-            spec=client.V1IngressSpec(
-                rules=[client.V1IngressRule(
-                    host=f"vs-code-{session_uuid}.preview.hyperbola.in",
-                    http=client.V1HTTPIngressRuleValue(
-                        paths=[client.V1HTTPIngressPath(
-                            path="/",
-                            path_type="Prefix",
-                            backend=client.V1IngressBackend(
-                                service=client.V1IngressServiceBackend(
-                                    name=f"user-{session_uuid}",
-                                    port=client.V1ServiceBackendPort(number=80)
-                                )
+    )
+
+
+def build_user_ingress(session_uuid):
+    """Ingress for external access via subdomain"""
+    return client.V1Ingress(
+        metadata=client.V1ObjectMeta(
+            name=f"user-{session_uuid}",
+            labels={"session-uuid": session_uuid},
+            annotations={
+                "kubernetes.io/ingress.class": "nginx",
+                "cert-manager.io/cluster-issuer": "letsencrypt-prod"
+            }
+        ),
+        spec=client.V1IngressSpec(
+            rules=[client.V1IngressRule(
+                host=f"vs-code-{session_uuid}.preview.hyperbola.in",
+                http=client.V1HTTPIngressRuleValue(
+                    paths=[client.V1HTTPIngressPath(
+                        path="/",
+                        path_type="Prefix",
+                        backend=client.V1IngressBackend(
+                            service=client.V1IngressServiceBackend(
+                                name=f"user-{session_uuid}",
+                                port=client.V1ServiceBackendPort(number=80)
                             )
-                        )]
-                    )
-                )],
-                tls=[client.V1IngressTLS(
-                    hosts=[f"vs-code-{session_uuid}.preview.hyperbola.in"],
-                    secret_name=f"tls-{session_uuid}"
-                )]
-            )
+                        )
+                    )]
+                )
+            )],
+            tls=[client.V1IngressTLS(
+                hosts=[f"vs-code-{session_uuid}.preview.hyperbola.in"],
+                secret_name=f"tls-{session_uuid}"
+            )]
         )
+    )
+
+
+def build_user_scaledobject(session_uuid):
+    """KEDA ScaledObject driving the user pod from session-manager's external scaler"""
+    return {
+        'apiVersion': 'keda.sh/v1alpha1',
+        'kind': 'ScaledObject',
+        'metadata': {
+            'name': f"user-{session_uuid}-scaler",
+            'labels': {"session-uuid": session_uuid}
+        },
+        'spec': {
+            'scaleTargetRef': {'name': f"user-{session_uuid}"},
+            'minReplicaCount': 0,
+            'maxReplicaCount': 1,
+            'cooldownPeriod': SCALER_COOLDOWN,
+            'triggers': [{
+                'type': 'external-push',
+                'metadata': {
+                    'scalerAddress': KEDA_SCALER_ADDRESS,
+                    'sessionUuid': session_uuid
+                }
+            }]
+        }
+    }
+
+
+# ============================================================================
+# ADMISSION CONTROL - Capacity budget and fair per-user queue for creates
+# ============================================================================
+# {admission}:committed        capacity held by sessions (pods, cpu_m, memory_mi, storage_gi)
+# {admission}:reserved         uuid -> JSON of what each session holds, so releases are exact
+# {admission}:users            round-robin list of users with queued creates
+# {admission}:user:{user_id}   that user's tickets, oldest first
+# admission:ticket:{id}        ticket status returned to clients
+# Keys the scripts touch share the {admission} hash tag, so they run on one cluster slot.
+
+ADMISSION_COMMITTED = '{admission}:committed'
+ADMISSION_RESERVED = '{admission}:reserved'
+ADMISSION_USERS = '{admission}:users'
+ADMISSION_USERS_SET = '{admission}:users:set'
+ADMISSION_QUEUED = '{admission}:queued'
+ADMISSION_USER_PREFIX = '{admission}:user:'
+
+RESOURCE_KEYS = ['pods', 'cpu_m', 'memory_mi', 'storage_gi']
+COMPUTE_KEYS = ['pods', 'cpu_m', 'memory_mi']
+
+# Container requests per scale profile (see build_user_deployment and scale_session)
+POD_PROFILES = {
+    'default': {'cpu_m': 250, 'memory_mi': 256},
+    'up': {'cpu_m': 1000, 'memory_mi': 1024},
+    'down': {'cpu_m': 500, 'memory_mi': 512},
+}
+SESSION_STORAGE_GI = 5
+
+RESERVE_SCRIPT = """
+local fields = {'pods', 'cpu_m', 'memory_mi', 'storage_gi'}
+local held = cjson.decode(redis.call('HGET', KEYS[2], ARGV[10]) or '{}')
+if ARGV[12] ~= '' and (held[ARGV[12]] or 0) ~= 0 then
+    return 1
+end
+if tonumber(ARGV[9]) == 0 then
+    for i, field in ipairs(fields) do
+        local limit = tonumber(ARGV[i + 4])
+        local used = tonumber(redis.call('HGET', KEYS[1], field) or '0')
+        if limit > 0 and used + tonumber(ARGV[i]) > limit then
+            return 0
+        end
+    end
+end
+for i, field in ipairs(fields) do
+    local amount = tonumber(ARGV[i])
+    if amount ~= 0 then
+        redis.call('HINCRBY', KEYS[1], field, amount)
+        held[field] = (held[field] or 0) + amount
+    end
+end
+held['at'] = tonumber(ARGV[11])
+redis.call('HSET', KEYS[2], ARGV[10], cjson.encode(held))
+return 1
+"""
+
+RELEASE_SCRIPT = """
+local raw = redis.call('HGET', KEYS[2], ARGV[1])
+if not raw then
+    return 0
+end
+local held = cjson.decode(raw)
+for i = 2, #ARGV do
+    local amount = tonumber(held[ARGV[i]] or 0)
+    if amount ~= 0 then
+        redis.call('HINCRBY', KEYS[1], ARGV[i], -amount)
+    end
+    held[ARGV[i]] = nil
+end
+local at = held['at']
+held['at'] = nil
+if next(held) == nil then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+else
+    held['at'] = at
+    redis.call('HSET', KEYS[2], ARGV[1], cjson.encode(held))
+end
+return 1
+"""
+
+# Recompute committed capacity from the reservations it is the sum of
+RESYNC_SCRIPT = """
+local totals = {pods = 0, cpu_m = 0, memory_mi = 0, storage_gi = 0}
+for _, raw in ipairs(redis.call('HVALS', KEYS[2])) do
+    local held = cjson.decode(raw)
+    for field, total in pairs(totals) do
+        totals[field] = total + (held[field] or 0)
+    end
+end
+redis.call('HSET', KEYS[1], 'pods', totals.pods, 'cpu_m', totals.cpu_m,
+    'memory_mi', totals.memory_mi, 'storage_gi', totals.storage_gi)
+return 1
+"""
+
+ENQUEUE_SCRIPT = """
+redis.call('RPUSH', KEYS[2], ARGV[2])
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return redis.call('INCR', KEYS[4])
+"""
+
+# Next ticket in round-robin order: take the head user's oldest ticket, rotate the user to the back
+POP_TICKET_SCRIPT = """
+while true do
+    local user_id = redis.call('LPOP', KEYS[1])
+    if not user_id then
+        return false
+    end
+    local user_key = ARGV[1] .. user_id
+    local ticket_id = redis.call('LPOP', user_key)
+    if redis.call('LLEN', user_key) > 0 then
+        redis.call('RPUSH', KEYS[1], user_id)
+    else
+        redis.call('SREM', KEYS[2], user_id)
+    end
+    if ticket_id then
+        redis.call('DECR', KEYS[3])
+        return {user_id, ticket_id}
+    end
+end
+"""
+
+
+def session_resources(profile='default', storage=True):
+    """Capacity one running session commits"""
+    resources = {'pods': 1, **POD_PROFILES[profile]}
+    if storage:
+        resources['storage_gi'] = SESSION_STORAGE_GI
+    return resources
+
+
+def reserve_capacity(session_uuid, resources, force=False, unless_held=''):
+    """Atomically commit capacity for a session; False if it would exceed the budget.
+    
+    With unless_held='pods' (say), nothing is added if the session already holds pods.
+    """
+    return bool(r.eval(
+        RESERVE_SCRIPT, 2, ADMISSION_COMMITTED, ADMISSION_RESERVED,
+        *[resources.get(k, 0) for k in RESOURCE_KEYS],
+        *[ADMISSION_BUDGET[k] for k in RESOURCE_KEYS],
+        1 if force else 0,
+        session_uuid,
+        time.time(),
+        unless_held
+    ))
+
+
+def release_capacity(session_uuid, keys=RESOURCE_KEYS):
+    """Return what the session holds for the given resource kinds"""
+    r.eval(RELEASE_SCRIPT, 2, ADMISSION_COMMITTED, ADMISSION_RESERVED, session_uuid, *keys)
+
+
+def commit_running(session_uuid, session_data):
+    """Re-commit compute when a session runs again after sleep or a KEDA scale to zero.
+    
+    Never blocked by the budget, and a no-op while the session still holds compute.
+    """
+    profile = session_resources(session_data.get('profile') or 'default', storage=False)
+    reserve_capacity(session_uuid, profile, force=True, unless_held='pods')
+
+
+def record_admission(decision):
+    r.hincrby('admission:decisions', decision, 1)
+
+
+def queue_position(ticket_id, user_id):
+    """1-based position of a ticket in round-robin order (None once dequeued)"""
+    users = r.lrange(ADMISSION_USERS, 0, -1)
+    if user_id not in users:
+        return None
+    ticket_index = r.lpos(ADMISSION_USER_PREFIX + user_id, ticket_id)
+    if ticket_index is None:
+        return None
+    
+    pipe = r.pipeline(transaction=False)
+    for other in users:
+        pipe.llen(ADMISSION_USER_PREFIX + other)
+    lengths = pipe.execute()
+    
+    # Full rounds before this ticket's round, then users ahead of us in that round
+    user_index = users.index(user_id)
+    position = sum(min(length, ticket_index) for length in lengths)
+    position += sum(1 for length in lengths[:user_index] if length > ticket_index)
+    return position + 1
+
+
+def ticket_status(ticket_id):
+    """Client view of an admission ticket"""
+    ticket = r.hgetall(f'admission:ticket:{ticket_id}')
+    if not ticket:
+        raise ValueError(f"Ticket {ticket_id} not found")
+    
+    status = {'ticket': ticket_id, **ticket}
+    if ticket.get('status') == 'queued':
+        position = queue_position(ticket_id, ticket['user_id'])
+        interval = float(r.hget('admission:stats', 'admit_interval') or ADMISSION_WAIT_PER_SLOT)
+        status['position'] = position
+        status['estimated_wait_seconds'] = int(position * interval) if position else None
+    return status
+
+
+def enqueue_create(user_id):
+    """Queue a create that doesn't fit the budget; returns the ticket id"""
+    ticket_id = uuid.uuid4().hex[:12]
+    r.hset(f'admission:ticket:{ticket_id}', mapping={
+        'user_id': user_id,
+        'status': 'queued',
+        'enqueued_at': datetime.utcnow().isoformat()
+    })
+    r.expire(f'admission:ticket:{ticket_id}', SESSION_TTL)
+    r.eval(
+        ENQUEUE_SCRIPT, 4, ADMISSION_USERS, ADMISSION_USER_PREFIX + user_id,
+        ADMISSION_USERS_SET, ADMISSION_QUEUED, user_id, ticket_id
+    )
+    record_admission('queued')
+    logger.info(f"⏳ Create queued for {user_id}: ticket {ticket_id}")
+    return ticket_id
+
+
+def admit_from_queue():
+    """Provision queued creates, fairly across users, while capacity allows"""
+    if int(r.get(ADMISSION_QUEUED) or 0) == 0:
+        return
+    if not r.set('admission-lock', WORKER_ID, nx=True, ex=300):
+        return
+    try:
+        while int(r.get(ADMISSION_QUEUED) or 0) > 0:
+            session_uuid = str(uuid.uuid4())[:8]
+            if not reserve_capacity(session_uuid, session_resources()):
+                return  # Still over budget
+            
+            # Per-user ticket lists aren't declared KEYS, but share the {admission} slot
+            popped = r.eval(POP_TICKET_SCRIPT, 3, ADMISSION_USERS, ADMISSION_USERS_SET, ADMISSION_QUEUED, ADMISSION_USER_PREFIX)
+            if not popped:
+                release_capacity(session_uuid)
+                r.delete(session_key(session_uuid))
+                return
+            user_id, ticket_id = popped
+            
+            # Smoothed time between queue admissions drives wait estimates
+            now = time.time()
+            last = r.getset('admission:last_admit', now)
+            if last:
+                previous = float(r.hget('admission:stats', 'admit_interval') or ADMISSION_WAIT_PER_SLOT)
+                r.hset('admission:stats', 'admit_interval', 0.8 * previous + 0.2 * min(now - float(last), 3600))
+            
+            try:
+                session = provision_session(session_uuid, user_id)
+                r.hset(f'admission:ticket:{ticket_id}', mapping={
+                    'status': 'admitted',
+                    'uuid': session_uuid,
+                    'workspace_url': session['workspace_url']
+                })
+                record_admission('admitted_from_queue')
+            except Exception as e:
+                logger.error(f"❌ Queued create failed for {user_id}: {str(e)}", exc_info=True)
+                release_capacity(session_uuid)
+                r.delete(session_key(session_uuid))
+                r.hset(f'admission:ticket:{ticket_id}', mapping={'status': 'failed', 'error': str(e)})
+                record_admission('failed')
+    finally:
+        if r.get('admission-lock') == WORKER_ID:
+            r.delete('admission-lock')
+
+
+def run_admission_worker():
+    """Background loop admitting queued creates as capacity frees up"""
+    while True:
+        time.sleep(ADMISSION_INTERVAL)
+        if not r:
+            continue
+        try:
+            admit_from_queue()
+        except Exception as e:
+            logger.warning(f"Admission sweep failed: {str(e)}")
+
+
+# Runs even without a budget: creates queued before the budget was lifted still need admitting
+if ADMISSION_WORKER_ENABLED:
+    threading.Thread(target=run_admission_worker, name='admission-worker', daemon=True).start()
+
+
+def provision_session(session_uuid, user_id):
+    """Create a session's Kubernetes objects and Redis record"""
+    start_time = time.time()
+    namespace = namespace_ring.get_node(session_uuid)
+    
+    logger.info(f"🆕 Creating session for user: {user_id} (namespace: {namespace})")
+    
+    data_source, workspace_source = golden_data_source()
+    core_v1.create_namespaced_persistent_volume_claim(
+        namespace=namespace,
+        body=build_user_pvc(session_uuid, data_source=data_source)
+    )
+    logger.info(f"✅ PVC created: pvc-{session_uuid} (source: {workspace_source})")
+    
+    v1.create_namespaced_deployment(namespace=namespace, body=build_user_deployment(session_uuid, user_id))
+    logger.info(f"✅ Deployment created: user-{session_uuid}")
+    
+    core_v1.create_namespaced_service(namespace=namespace, body=build_user_service(session_uuid))
+    logger.info(f"✅ Service created: user-{session_uuid}")
+    
+    networking_v1.create_namespaced_ingress(namespace=namespace, body=build_user_ingress(session_uuid))
+    logger.info(f"✅ Ingress created: user-{session_uuid}")
+    
+    if KEDA_SCALER_ENABLED:
+        # Scaling decisions are pushed by our own external scaler, so no TriggerAuthentication is needed
+        custom_api.create_namespaced_custom_object(
+            group="keda.sh",
+            version="v1alpha1",
+            namespace=namespace,
+            plural="scaledobjects",
+            body=build_user_scaledobject(session_uuid)
+        )
+        logger.info(f"✅ KEDA ScaledObject created: user-{session_uuid}-scaler")
+    else:
+        # Pods will be manually scaled up on message, and stay running
+        # Use /session/{uuid}/sleep endpoint to manually scale down
+        logger.info(f"ℹ️ KEDA disabled - manual scaling only for: user-{session_uuid}")
+    
+    # Store session with TTL
+    r.hset(session_key(session_uuid), mapping={
+        'user_id': user_id,
+        'status': 'created',
+        'namespace': namespace,
+        'profile': 'default',
+        'autoscaler': 'keda' if KEDA_SCALER_ENABLED else 'manual',
+        'workspace_source': workspace_source,
+        'created_at': datetime.utcnow().isoformat(),
+        'last_activity': datetime.utcnow().isoformat()
+    })
+    set_session_ttl(session_uuid)
+    r.zadd('ready:pending', {session_uuid: start_time})
+    
+    log_event(session_uuid, 'session_created', {'user_id': user_id, 'namespace': namespace, 'workspace_source': workspace_source})
+    
+    elapsed = time.time() - start_time
+    logger.info(f"🎉 Session created successfully in {elapsed:.2f}s: {session_uuid}")
+    
+    return {
+        'uuid': session_uuid,
+        'user_id': user_id,
+        'status': 'created',
+        'namespace': namespace,
+        'created_at': datetime.utcnow().isoformat(),
+        # Construct workspace URL with subdomain
+        'workspace_url': f"https://vs-code-{session_uuid}.preview.hyperbola.in"
+    }
+
+
+@app.route('/session/create', methods=['POST'])
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=100, window=60)
+def create_session():
+    """Create new session with dedicated pod resources, or queue it when over capacity"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    session_uuid = str(uuid.uuid4())[:8]
+    user_id = request.json.get('user_id')
+    
+    if not user_id:
+        raise ValueError("user_id is required")
+    
+    # Waiting creates go first so a burst can't starve the queue
+    if int(r.get(ADMISSION_QUEUED) or 0) == 0 and reserve_capacity(session_uuid, session_resources()):
+        record_admission('admitted')
+        try:
+            return jsonify(provision_session(session_uuid, user_id)), 201
+        except Exception as e:
+            logger.error(f"❌ Failed to create session: {str(e)}", exc_info=True)
+            release_capacity(session_uuid)
+            r.delete(session_key(session_uuid))
+            raise
+    
+    ticket_id = enqueue_create(user_id)
+    return jsonify(ticket_status(ticket_id)), 202
+
+
+@app.route('/admission/<ticket_id>')
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=200, window=60)
+def admission_status(ticket_id):
+    """Queue position, estimated wait, or the admitted session for a queued create"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    return jsonify(ticket_status(ticket_id)), 200
+
+@app.route('/session/<session_uuid>/wake', methods=['POST'])
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=50, window=60)
+def wake_session(session_uuid):
+    """Wake up sleeping pod"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    session_data = check_session_exists(session_uuid)
+    namespace = session_namespace(session_data)
+    
+    try:
+        if migration_pending(session_uuid, session_data):
+            # Moving namespace: the pod starts in the new one once the move finishes
+            r.hset(session_key(session_uuid), mapping={
+                'last_activity': datetime.utcnow().isoformat(),
+                'status': 'running'
+            })
+            commit_running(session_uuid, session_data)
+            set_session_ttl(session_uuid)
+            
+            return jsonify({
+                'uuid': session_uuid,
+                'action': 'wake',
+                'status': 'migrating',
+                'migration': migration_progress(r.hgetall(session_key(session_uuid)))
+            }), 202
+        
+        if session_data.get('storage'):
+            # Workspace is archived: restore its PVC first, the pod starts once that finishes
+            r.hset(session_key(session_uuid), mapping={
+                'last_activity': datetime.utcnow().isoformat(),
+                'status': 'running'
+            })
+            commit_running(session_uuid, session_data)
+            set_session_ttl(session_uuid)
+            if session_data['storage'] == 'archived':
+                request_restore(session_uuid, session_data)
+            
+            return jsonify({
+                'uuid': session_uuid,
+                'action': 'wake',
+                'status': 'restoring',
+                'storage': storage_progress(session_uuid)
+            }), 202
         
-        networking_v1 = client.NetworkingV1Api()
-        networking_v1.create_namespaced_ingress(namespace="default", body=ingress)
-        logger.info(f"✅ Ingress created: user-{session_uuid}")
-        
-        # NOTE: KEDA ScaledObject removed due to authentication issues
-        # Pods will be manually scaled up on message, and stay running
-        # Use /session/{uuid}/sleep endpoint to manually scale down
-        logger.info(f"ℹ️ KEDA disabled - manual scaling only for: user-{session_uuid}")
-        
-        # Store session with TTL
-        r.hset(f'session:{session_uuid}', mapping={
-            'user_id': user_id,
-            'status': 'created',
-            'created_at': datetime.utcnow().isoformat(),
-            'last_activity': datetime.utcnow().isoformat()
-        })
-        set_session_ttl(session_uuid)
-        
-        log_event(session_uuid, 'session_created', {'user_id': user_id})
+        # Scale deployment to 1
+        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
+        if deployment.spec.replicas == 0:
+            deployment.spec.replicas = 1
+            v1.patch_namespaced_deployment(
+                name=f"user-{session_uuid}",
+                namespace=namespace,
+                body=deployment
+            )
+            logger.info(f"⏰ Waking up session: {session_uuid}")
         
-        elapsed = time.time() - start_time
-        logger.info(f"🎉 Session created successfully in {elapsed:.2f}s: {session_uuid}")
+        r.hset(session_key(session_uuid), 'last_activity', datetime.utcnow().isoformat())
+        r.hset(session_key(session_uuid), 'status', 'running')
+        commit_running(session_uuid, session_data)
+        set_session_ttl(session_uuid)
         
-        # Construct workspace URL with subdomain
-        workspace_url = f"https://vs-code-{session_uuid}.preview.hyperbola.in"
+        notify_activity(session_uuid)
+        log_event(session_uuid, 'session_woken', {'user_id': session_data.get('user_id')})
         
         return jsonify({
             'uuid': session_uuid,
-            'user_id': user_id,
-            'status': 'created',
-            'created_at': datetime.utcnow().isoformat(),
-            'workspace_url': workspace_url
-        }), 201
+            'action': 'wake',
+            'status': 'waking'
+        }), 200
+    except Exception as e:
+        logger.error(f"❌ Failed to wake session: {str(e)}", exc_info=True)
+        raise
+
+@app.route('/session/<session_uuid>/status')
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=200, window=60)
+def session_status(session_uuid):
+    """Get current session status"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    session_data = check_session_exists(session_uuid)
+    namespace = session_namespace(session_data)
+    queue_length = r.llen(session_key(session_uuid, 'queue'))
+    
+    try:
+        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
+        replicas = deployment.status.replicas or 0
+    except ApiException as e:
+        logger.warning(f"Deployment not found: {session_uuid}")
+        replicas = 0
+    
+    return jsonify({
+        'uuid': session_uuid,
+        'session': session_data,
+        'queue_length': queue_length,
+        'dead_lettered': r.llen(session_key(session_uuid, 'dlq')),
+        'storage': storage_progress(session_uuid),
+        'replicas': replicas,
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
+
+# ============================================================================
+# MESSAGE DELIVERY - Durable per-session queue drained to user pods
+# ============================================================================
+# queue:{uuid}       pending messages (LPUSH in, consumed from the right = FIFO)
+# processing:{uuid}  in-flight messages, removed (acked) once the pod answers
+# dlq:{uuid}         messages that failed DELIVERY_MAX_ATTEMPTS times
+# replies:{uuid}     pod responses for clients to fetch
+# delivery:pending   set of sessions with queued messages
+
+def enqueue_message(session_uuid, message):
+    """Store the message payload durably and flag the session for delivery"""
+    item = {
+        'id': uuid.uuid4().hex[:12],
+        'message': message,
+        'enqueued_at': datetime.utcnow().isoformat(),
+        'attempts': 0
+    }
+    r.lpush(session_key(session_uuid, 'queue'), json.dumps(item))
+    r.sadd('delivery:pending', session_uuid)
+    return item['id']
+
+
+def store_reply(session_uuid, message_id, pod_response):
+    """Keep the pod's answer where clients can fetch it"""
+    reply = {
+        'message_id': message_id,
+        'timestamp': datetime.utcnow().isoformat(),
+        'response': pod_response
+    }
+    r.lpush(session_key(session_uuid, 'replies'), json.dumps(reply))
+    r.ltrim(session_key(session_uuid, 'replies'), 0, 999)  # Keep last 1000 replies
+
+
+def pod_ready(session_uuid, namespace):
+    """True once the user pod is ready to serve requests"""
+    deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
+    return bool(deployment.status.ready_replicas)
+
+
+def forward_to_pod(http, session_uuid, namespace, message):
+    """POST one message to the user pod and return its JSON reply"""
+    pod_service = f"user-{session_uuid}.{namespace}.svc.cluster.local"
+    timeout = call_timeout('pod', POD_TIMEOUT)
+    with pod_breaker(session_uuid).guard(pod_failure), \
+            trace_span('pod.forward', kind='client', session_uuid=session_uuid):
+        response = http.post(
+            f"http://{pod_service}:80/chat",
+            json={"message": message},
+            # The pod gets the time we will actually wait for it
+            headers={**traceparent_header(), 'X-Request-Timeout': f"{timeout:.1f}"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def deliver_session(session_uuid):
+    """Drain up to DELIVERY_BATCH_SIZE queued messages to the session's pod"""
+    lock_key = session_key(session_uuid, 'delivery-lock')
+    if not r.set(lock_key, WORKER_ID, nx=True, ex=DELIVERY_BATCH_SIZE * 6 + 30):
+        return  # Another worker owns this session
+    
+    queue_key = session_key(session_uuid, 'queue')
+    processing_key = session_key(session_uuid, 'processing')
+    try:
+        session_data = r.hgetall(session_key(session_uuid))
+        if not session_data:
+            r.srem('delivery:pending', session_uuid)
+            return
+        
+        # Anything still in-flight belongs to a worker that died mid-batch; put it back in order
+        while r.lmove(processing_key, queue_key, 'LEFT', 'RIGHT'):
+            pass
+        
+        namespace = session_namespace(session_data)
+        if not pod_ready(session_uuid, namespace):
+            return
+        
+        delivered = 0
+        with requests.Session() as http:
+            for _ in range(DELIVERY_BATCH_SIZE):
+                raw = r.lmove(queue_key, processing_key, 'RIGHT', 'LEFT')
+                if raw is None:
+                    break
+                try:
+                    item = json.loads(raw)
+                except ValueError:
+                    item = None
+                if not isinstance(item, dict) or not all(field in item for field in ('id', 'message', 'attempts')):
+                    # Not a message we wrote (e.g. the old 'chat' KEDA marker); park it instead of blocking the queue
+                    r.lpush(session_key(session_uuid, 'dlq'), json.dumps({'raw': raw, 'last_error': 'undecodable queue item'}))
+                    r.lrem(processing_key, 1, raw)
+                    logger.warning(f"⚠️ Dead-lettered undecodable queue item for {session_uuid}")
+                    continue
+                
+                try:
+                    pod_response = forward_to_pod(http, session_uuid, namespace, item['message'])
+                except DependencyUnavailable:
+                    # Pod's breaker is open: not an attempt, leave the message for a later sweep
+                    r.rpush(queue_key, raw)
+                    r.lrem(processing_key, 1, raw)
+                    break
+                except Exception as e:
+                    item['attempts'] += 1
+                    item['last_error'] = str(e)
+                    # 4xx means the pod rejected the message; retrying won't help
+                    rejected = isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code < 500
+                    if rejected or item['attempts'] >= DELIVERY_MAX_ATTEMPTS:
+                        r.lpush(session_key(session_uuid, 'dlq'), json.dumps(item))
+                        log_event(session_uuid, 'message_dead_lettered', {'message_id': item['id'], 'error': str(e)})
+                    else:
+                        # Back to the head of the queue so ordering is kept on retry
+                        r.rpush(queue_key, json.dumps(item))
+                        logger.warning(f"⚠️ Delivery failed for {session_uuid} (attempt {item['attempts']}): {str(e)}")
+                    r.lrem(processing_key, 1, raw)
+                    break  # Pod is unhealthy; try again next sweep
+                
+                store_reply(session_uuid, item['id'], pod_response)
+                r.lrem(processing_key, 1, raw)  # Ack
+                delivered += 1
+        
+        if delivered:
+            log_event(session_uuid, 'messages_delivered', {'count': delivered})
+        if r.llen(queue_key) == 0:
+            r.srem('delivery:pending', session_uuid)
+            notify_activity(session_uuid)
+    finally:
+        if r.get(lock_key) == WORKER_ID:
+            r.delete(lock_key)
+
+
+def run_delivery_worker():
+    """Background loop delivering queued messages once pods are ready"""
+    while True:
+        time.sleep(DELIVERY_INTERVAL)
+        if not r:
+            continue
+        try:
+            pending = r.smembers('delivery:pending')
+        except Exception as e:
+            logger.warning(f"Delivery sweep failed: {str(e)}")
+            continue
+        
+        for session_uuid in pending:
+            token = current_trace.set(Trace(sampled=random.random() < TRACE_SAMPLE_RATE))
+            try:
+                with trace_span('delivery.session', session_uuid=session_uuid):
+                    deliver_session(session_uuid)
+            except Exception as e:
+                logger.warning(f"Delivery to {session_uuid} failed: {str(e)}")
+            finally:
+                submit_trace(current_trace.get())
+                current_trace.reset(token)
+
+
+if DELIVERY_WORKER_ENABLED:
+    threading.Thread(target=run_delivery_worker, name='delivery-worker', daemon=True).start()
+
+
+# ============================================================================
+# TIERED STORAGE - Hibernate idle workspaces to backup-pvc, restore on wake
+# ============================================================================
+# session:{uuid} storage      hibernating | archived | restoring (absent = live PVC)
+# storage:hibernations:{ns}   idle sessions to archive, oldest idle first
+# storage:restores:{ns}       archived sessions to restore, most recently archived first
+# storage:retries:{ns}        failed restores waiting to be requeued, scored by retry time
+# storage:active:{ns}         the one archive/restore/prune job running in a namespace
+#                             (backup-pvc is ReadWriteOnce, so jobs run one at a time)
+# storage:prune:{ns}          set when a session with an archive is deleted; prune soon
+# storage:pruned:{ns}         when the namespace's archives were last pruned
+
+def archive_path(session_uuid):
+    return f"/backup/hibernate/{session_uuid}.tar.gz"
+
+
+def build_storage_job(session_uuid, action):
+    """Job that archives pvc-{uuid} into backup-pvc, or restores it from there"""
+    archive = archive_path(session_uuid)
+    if action == 'hibernate':
+        script = (
+            f"mkdir -p /backup/hibernate && "
+            f"tar czf {archive}.tmp -C /app . && "
+            f"mv {archive}.tmp {archive} && "
+            f"echo 'Archived {session_uuid}'"
+        )
+    else:
+        script = (
+            f"tar xzf {archive} -C /app && "
+            f"rm -f {archive} && "
+            f"echo 'Restored {session_uuid}'"
+        )
+    
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(
+            name=f"{action}-{session_uuid}-{int(time.time())}",
+            labels={"session-uuid": session_uuid, "job-type": action}
+        ),
+        spec=client.V1JobSpec(
+            backoff_limit=2,
+            ttl_seconds_after_finished=300,  # Auto-delete after 5 min
+            template=client.V1PodTemplateSpec(
+                spec=client.V1PodSpec(
+                    restart_policy="Never",
+                    containers=[
+                        client.V1Container(
+                            name=action,
+                            image="alpine:latest",
+                            command=["/bin/sh", "-c"],
+                            args=[script],
+                            volume_mounts=[
+                                client.V1VolumeMount(
+                                    name="user-data",
+                                    mount_path="/app",
+                                    read_only=action == 'hibernate'
+                                ),
+                                client.V1VolumeMount(
+                                    name="backup-storage",
+                                    mount_path="/backup"
+                                )
+                            ]
+                        )
+                    ],
+                    volumes=[
+                        client.V1Volume(
+                            name="user-data",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name=f"pvc-{session_uuid}"
+                            )
+                        ),
+                        client.V1Volume(
+                            name="backup-storage",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name="backup-pvc"  # Shared backup storage (one per workspace namespace)
+                            )
+                        )
+                    ]
+                )
+            )
+        )
+    )
+
+
+def build_prune_job(keep):
+    """Job that removes archives in backup-pvc not owned by any of the `keep` sessions"""
+    script = (
+        'cd /backup/hibernate 2>/dev/null || exit 0; '
+        'rm -f *.tar.gz.tmp; '
+        'for f in *.tar.gz; do '
+        '[ -e "$f" ] || continue; '
+        'case " $KEEP " in *" ${f%.tar.gz} "*) ;; *) rm -f "$f" && echo "Pruned $f";; esac; '
+        'done'
+    )
+    
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(
+            name=f"prune-archives-{int(time.time())}",
+            labels={"job-type": "prune"}
+        ),
+        spec=client.V1JobSpec(
+            backoff_limit=2,
+            ttl_seconds_after_finished=300,  # Auto-delete after 5 min
+            template=client.V1PodTemplateSpec(
+                spec=client.V1PodSpec(
+                    restart_policy="Never",
+                    containers=[
+                        client.V1Container(
+                            name="prune",
+                            image="alpine:latest",
+                            command=["/bin/sh", "-c"],
+                            args=[script],
+                            env=[client.V1EnvVar(name="KEEP", value=' '.join(sorted(keep)))],
+                            volume_mounts=[
+                                client.V1VolumeMount(
+                                    name="backup-storage",
+                                    mount_path="/backup"
+                                )
+                            ]
+                        )
+                    ],
+                    volumes=[
+                        client.V1Volume(
+                            name="backup-storage",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name="backup-pvc"  # Shared backup storage (one per workspace namespace)
+                            )
+                        )
+                    ]
+                )
+            )
+        )
+    )
+
+
+def request_restore(session_uuid, session_data):
+    """Recreate the PVC and queue the archive to be restored into it"""
+    namespace = session_namespace(session_data)
+    try:
+        core_v1.create_namespaced_persistent_volume_claim(namespace=namespace, body=build_user_pvc(session_uuid))
+    except ApiException as e:
+        if e.status != 409:
+            raise
+    
+    # A retry after a failed restore reuses the PVC, and the storage it already holds
+    reserve_capacity(session_uuid, {'storage_gi': SESSION_STORAGE_GI}, force=True, unless_held='storage_gi')
+    r.hset(session_key(session_uuid), mapping={
+        'storage': 'restoring',
+        'restore_requested_at': datetime.utcnow().isoformat()
+    })
+    archived_at = datetime.fromisoformat(session_data.get('archived_at') or datetime.utcnow().isoformat())
+    r.zadd(f'storage:restores:{namespace}', {session_uuid: archived_at.timestamp()})
+    log_event(session_uuid, 'restore_requested', {'namespace': namespace})
+    logger.info(f"📦 Restore queued for {session_uuid}")
+
+
+def storage_progress(session_uuid):
+    """Client view of a hibernated workspace: state, queue position, job phase"""
+    session_data = r.hgetall(session_key(session_uuid))
+    state = session_data.get('storage')
+    if not state:
+        return None
+    
+    progress = {'state': state, 'archived_at': session_data.get('archived_at')}
+    if state == 'restoring':
+        namespace = session_namespace(session_data)
+        rank = r.zrevrank(f'storage:restores:{namespace}', session_uuid)
+        retry_at = r.zscore(f'storage:retries:{namespace}', session_uuid)
+        if rank is not None:
+            progress['phase'] = 'queued'
+            progress['queue_position'] = rank + 1
+        elif retry_at is not None:
+            progress['phase'] = 'retrying'
+            progress['retry_in'] = max(round(retry_at - time.time()), 0)
+            progress['attempts'] = int(session_data.get('restore_attempts') or 0)
+        else:
+            progress['phase'] = 'running'
+            progress['started_at'] = session_data.get('storage_job_started_at')
+    return progress
+
+
+def start_storage_job(session_uuid, namespace, action):
+    job = build_storage_job(session_uuid, action)
+    batch_v1.create_namespaced_job(namespace=namespace, body=job)
+    r.set(f'storage:active:{namespace}', json.dumps({
+        'uuid': session_uuid,
+        'job': job.metadata.name,
+        'action': action,
+        'started_at': datetime.utcnow().isoformat()
+    }))
+    r.hset(session_key(session_uuid), mapping={
+        'storage_job': job.metadata.name,
+        'storage_job_started_at': datetime.utcnow().isoformat()
+    })
+    logger.info(f"💾 Started {action} job for {session_uuid}: {job.metadata.name}")
+
+
+def finish_hibernate(session_uuid, session_data, namespace, succeeded, started_at):
+    """Release the PVC once archived, unless the session woke up meanwhile"""
+    last_activity = session_data.get('last_activity') or ''
+    if succeeded and last_activity < started_at:
+        core_v1.delete_namespaced_persistent_volume_claim(name=f"pvc-{session_uuid}", namespace=namespace)
+        release_capacity(session_uuid, ['storage_gi'])
+        r.hset(session_key(session_uuid), mapping={
+            'storage': 'archived',
+            'archived_at': datetime.utcnow().isoformat()
+        })
+        log_event(session_uuid, 'session_hibernated', {'archive': archive_path(session_uuid)})
+        return
+    
+    # Failed, or woken while archiving: the PVC is still intact, carry on using it
+    r.hdel(session_key(session_uuid), 'storage')
+    log_event(session_uuid, 'hibernate_abandoned', {'succeeded': succeeded})
+    if session_data.get('status') == 'running':
+        resume_after_restore(session_uuid, session_data, namespace)
+
+
+def finish_restore(session_uuid, session_data, namespace, succeeded):
+    if not succeeded:
+        # The archive is only removed by a successful restore; a retry extracts it
+        # into the same PVC again, so both the PVC and its storage reservation are kept
+        attempts = r.hincrby(session_key(session_uuid), 'restore_attempts', 1)
+        if session_data.get('status') == 'running' and attempts < RESTORE_MAX_ATTEMPTS:
+            retry_in = min(300, STORAGE_INTERVAL * 2 ** attempts)
+            r.zadd(f'storage:retries:{namespace}', {session_uuid: time.time() + retry_in})
+            log_event(session_uuid, 'restore_failed', {'archive': archive_path(session_uuid), 'retry_in': retry_in})
+            return
+        # Out of attempts (or no longer wanted): the next wake or chat starts over
+        r.hset(session_key(session_uuid), 'storage', 'archived')
+        r.hdel(session_key(session_uuid), 'restore_attempts')
+        log_event(session_uuid, 'restore_failed', {'archive': archive_path(session_uuid), 'attempts': attempts})
+        return
+    
+    r.hdel(session_key(session_uuid), 'storage', 'archived_at', 'restore_attempts')
+    log_event(session_uuid, 'session_restored', {'archive': archive_path(session_uuid)})
+    if session_data.get('status') == 'running':
+        resume_after_restore(session_uuid, session_data, namespace)
+
+
+def resume_after_restore(session_uuid, session_data, namespace):
+    """Start the pod for a session that was woken while its storage was unavailable"""
+    commit_running(session_uuid, session_data)  # No-op unless its compute was released meanwhile
+    if not keda_managed(session_uuid, session_data, namespace):
+        v1.patch_namespaced_deployment(
+            name=f"user-{session_uuid}",
+            namespace=namespace,
+            body={'spec': {'replicas': 1}}
+        )
+    notify_activity(session_uuid)
+
+
+def check_storage_job(namespace):
+    """Finalize the namespace's archive/restore job once it completes; True if still busy"""
+    active = r.get(f'storage:active:{namespace}')
+    if not active:
+        return False
+    active = json.loads(active)
+    
+    try:
+        job = batch_v1.read_namespaced_job(name=active['job'], namespace=namespace)
+        if not job.status.succeeded and not job.status.failed:
+            return True
+        succeeded = bool(job.status.succeeded)
+    except ApiException as e:
+        if e.status != 404:
+            raise
+        succeeded = False  # Job vanished before we saw it finish
+    
+    r.delete(f'storage:active:{namespace}')
+    if active['action'] == 'prune':
+        if succeeded:
+            r.set(f'storage:pruned:{namespace}', time.time())
+            r.delete(f'storage:prune:{namespace}')
+        logger.info(f"💾 Archive prune in {namespace} {'succeeded' if succeeded else 'failed'}")
+        return False
+    
+    session_uuid = active['uuid']
+    session_data = r.hgetall(session_key(session_uuid))
+    if not session_data:
+        return False  # Session deleted while the job ran
+    
+    r.hdel(session_key(session_uuid), 'storage_job', 'storage_job_started_at')
+    if active['action'] == 'hibernate':
+        finish_hibernate(session_uuid, session_data, namespace, succeeded, active['started_at'])
+    else:
+        finish_restore(session_uuid, session_data, namespace, succeeded)
+    logger.info(f"💾 {active['action']} for {session_uuid} {'succeeded' if succeeded else 'failed'}")
+    return False
+
+
+def idle_since(session_data):
+    if session_data.get('status') == 'sleeping':
+        return session_data.get('sleeping_since') or session_data.get('last_activity')
+    return session_data.get('last_activity') or session_data.get('created_at')
+
+
+def start_next_storage_job(namespace):
+    """Restores first (most recently archived first), then the longest-idle hibernation"""
+    for session_uuid in r.zrangebyscore(f'storage:retries:{namespace}', '-inf', time.time()):
+        r.zrem(f'storage:retries:{namespace}', session_uuid)
+        archived_at = r.hget(session_key(session_uuid), 'archived_at') or datetime.utcnow().isoformat()
+        r.zadd(f'storage:restores:{namespace}', {session_uuid: datetime.fromisoformat(archived_at).timestamp()})
+    
+    for session_uuid in r.zrevrange(f'storage:restores:{namespace}', 0, 0):
+        r.zrem(f'storage:restores:{namespace}', session_uuid)
+        if r.hget(session_key(session_uuid), 'storage') == 'restoring':
+            start_storage_job(session_uuid, namespace, 'restore')
+            return
+    
+    while True:
+        candidates = r.zrange(f'storage:hibernations:{namespace}', 0, 0)
+        if not candidates:
+            break
+        session_uuid = candidates[0]
+        r.zrem(f'storage:hibernations:{namespace}', session_uuid)
         
+        # Re-check: the session may have woken or gone since it was queued
+        session_data = r.hgetall(session_key(session_uuid))
+        since = idle_since(session_data) if session_data else None
+        if not since or session_data.get('storage') or session_data.get('migration_step'):
+            continue
+        if (datetime.utcnow() - datetime.fromisoformat(since)).total_seconds() < HIBERNATE_AFTER_SECONDS:
+            continue
+        try:
+            deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
+            if deployment.spec.replicas or deployment.status.replicas:
+                continue  # Pod still running; the PVC is in use
+        except ApiException as e:
+            if e.status != 404:
+                raise
+        
+        r.hset(session_key(session_uuid), 'storage', 'hibernating')
+        start_storage_job(session_uuid, namespace, 'hibernate')
+        return
+    
+    last_pruned = float(r.get(f'storage:pruned:{namespace}') or 0)
+    if r.exists(f'storage:prune:{namespace}') or time.time() - last_pruned > ARCHIVE_PRUNE_INTERVAL:
+        start_prune_job(namespace)
+
+
+def start_prune_job(namespace):
+    """Remove archives whose session was deleted or expired"""
+    keep, sessions = set(), 0
+    for key in iter_session_keys():
+        session_data = r.hgetall(key)
+        if session_namespace(session_data) != namespace:
+            continue
+        sessions += 1
+        if session_data.get('storage'):
+            keep.add(uuid_from_key(key))
+    if not sessions:
+        # An empty keyspace usually means Redis lost its data, not that every session is gone
+        logger.warning(f"⚠️ No sessions found in {namespace}, not pruning archives")
+        r.set(f'storage:pruned:{namespace}', time.time())
+        return
+    
+    job = build_prune_job(keep)
+    batch_v1.create_namespaced_job(namespace=namespace, body=job)
+    r.set(f'storage:active:{namespace}', json.dumps({
+        'uuid': None,
+        'job': job.metadata.name,
+        'action': 'prune',
+        'started_at': datetime.utcnow().isoformat()
+    }))
+    logger.info(f"💾 Started archive prune in {namespace}: {job.metadata.name} (keeping {len(keep)})")
+
+
+def scan_hibernation_candidates():
+    """Queue sessions idle longer than HIBERNATE_AFTER_SECONDS for archiving"""
+    cutoff = datetime.utcnow().timestamp() - HIBERNATE_AFTER_SECONDS
+    for key in iter_session_keys():
+        session_data = r.hgetall(key)
+        since = idle_since(session_data)
+        if not since or session_data.get('storage') or session_data.get('migration_step'):
+            continue
+        idle_ts = datetime.fromisoformat(since).timestamp()
+        if idle_ts < cutoff:
+            r.zadd(f'storage:hibernations:{session_namespace(session_data)}', {uuid_from_key(key): idle_ts}, nx=True)
+
+
+def run_storage_worker():
+    """Background loop driving archive and restore jobs, one namespace job at a time"""
+    last_scan = 0
+    while True:
+        time.sleep(STORAGE_INTERVAL)
+        if not r:
+            continue
+        try:
+            if not r.set('storage-lock', WORKER_ID, nx=True, ex=int(STORAGE_INTERVAL * 4)):
+                continue
+            if HIBERNATION_ENABLED and time.time() - last_scan > HIBERNATE_SCAN_INTERVAL:
+                scan_hibernation_candidates()
+                last_scan = time.time()
+            for namespace in sorted(set(WORKSPACE_NAMESPACES) | {LEGACY_NAMESPACE}):
+                if not check_storage_job(namespace):
+                    start_next_storage_job(namespace)
+        except Exception as e:
+            logger.warning(f"Storage sweep failed: {str(e)}")
+        finally:
+            if r and r.get('storage-lock') == WORKER_ID:
+                r.delete('storage-lock')
+
+
+if STORAGE_WORKER_ENABLED:
+    threading.Thread(target=run_storage_worker, name='storage-worker', daemon=True).start()
+
+
+# ============================================================================
+# GOLDEN WORKSPACE - Clone new PVCs from a pre-populated source
+# ============================================================================
+
+# Redis keys:
+#   {golden}:seq            - last snapshot version number handed out
+#   {golden}:current        - version new PVCs are cloned from
+#   {golden}:pending        - version being snapshotted, promoted once ready everywhere
+#   {golden}:version:{n}    - hash: source_pvc, status, created_at, promoted_at, error
+#   ready:pending           - zset of new sessions awaiting their first ready pod (score = create time)
+#   ready:stats             - hash of {cloned|empty}:{count,sum,timeouts}
+#   ready:samples:{kind}    - recent time-to-ready samples for percentiles
+
+SNAPSHOT_GROUP = 'snapshot.storage.k8s.io'
+GOLDEN_SEQ = '{golden}:seq'
+GOLDEN_CURRENT = '{golden}:current'
+GOLDEN_PENDING = '{golden}:pending'
+READY_SAMPLES = 500
+
+
+def golden_namespaces():
+    return sorted(set(WORKSPACE_NAMESPACES) | {LEGACY_NAMESPACE})
+
+
+def golden_version_key(version):
+    return f"{{golden}}:version:{version}"
+
+
+def golden_snapshot_name(version):
+    return f"golden-v{version}"
+
+
+def golden_data_source():
+    """dataSource for a new workspace PVC and a label for where it came from"""
+    if GOLDEN_MODE == 'pvc':
+        return client.V1TypedLocalObjectReference(
+            kind='PersistentVolumeClaim',
+            name=GOLDEN_SOURCE_PVC
+        ), f"pvc/{GOLDEN_SOURCE_PVC}"
+    if GOLDEN_MODE == 'snapshot':
+        version = r.get(GOLDEN_CURRENT)
+        if version:
+            return client.V1TypedLocalObjectReference(
+                api_group=SNAPSHOT_GROUP,
+                kind='VolumeSnapshot',
+                name=golden_snapshot_name(version)
+            ), golden_snapshot_name(version)
+    return None, 'empty'
+
+
+def build_golden_snapshot(version, source_pvc):
+    spec = {'source': {'persistentVolumeClaimName': source_pvc}}
+    if GOLDEN_SNAPSHOT_CLASS:
+        spec['volumeSnapshotClassName'] = GOLDEN_SNAPSHOT_CLASS
+    return {
+        'apiVersion': f'{SNAPSHOT_GROUP}/v1',
+        'kind': 'VolumeSnapshot',
+        'metadata': {
+            'name': golden_snapshot_name(version),
+            'labels': {'app': 'golden-workspace', 'golden-version': str(version)}
+        },
+        'spec': spec
+    }
+
+
+def refresh_golden(source_pvc):
+    """Snapshot the golden source PVC in every workspace namespace as a new version"""
+    version = r.incr(GOLDEN_SEQ)
+    r.hset(golden_version_key(version), mapping={
+        'source_pvc': source_pvc,
+        'status': 'snapshotting',
+        'created_at': datetime.utcnow().isoformat()
+    })
+    try:
+        for namespace in golden_namespaces():
+            custom_api.create_namespaced_custom_object(
+                group=SNAPSHOT_GROUP,
+                version='v1',
+                namespace=namespace,
+                plural='volumesnapshots',
+                body=build_golden_snapshot(version, source_pvc)
+            )
     except Exception as e:
-        logger.error(f"❌ Failed to create session: {str(e)}", exc_info=True)
+        # Never pending, so promote_golden would never clean up the namespaces already snapshotted
+        r.hset(golden_version_key(version), mapping={'status': 'failed', 'error': str(e)})
+        try:
+            delete_golden_snapshots(version)
+        except Exception as cleanup_error:
+            logger.warning(f"Failed to delete snapshots of failed golden v{version}: {str(cleanup_error)}")
+        logger.error(f"❌ Golden workspace v{version} snapshot failed: {str(e)}")
         raise
+    
+    # A newer refresh supersedes one still in flight
+    superseded = r.getset(GOLDEN_PENDING, version)
+    if superseded:
+        r.hset(golden_version_key(superseded), 'status', 'superseded')
+        delete_golden_snapshots(superseded)
+    logger.info(f"📸 Golden workspace v{version} snapshotting from {source_pvc}")
+    return int(version)
+
+
+def delete_golden_snapshots(version):
+    for namespace in golden_namespaces():
+        try:
+            custom_api.delete_namespaced_custom_object(
+                group=SNAPSHOT_GROUP,
+                version='v1',
+                namespace=namespace,
+                plural='volumesnapshots',
+                name=golden_snapshot_name(version)
+            )
+        except ApiException as e:
+            if e.status != 404:
+                raise
+
+
+PROMOTE_GOLDEN_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[1])
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[3], 'status', 'current', 'promoted_at', ARGV[2])
+return 1
+"""
+
+
+def promote_golden():
+    """Make the pending version current once its snapshot is ready in every namespace"""
+    version = r.get(GOLDEN_PENDING)
+    if not version:
+        return
+    
+    for namespace in golden_namespaces():
+        try:
+            snapshot = custom_api.get_namespaced_custom_object(
+                group=SNAPSHOT_GROUP,
+                version='v1',
+                namespace=namespace,
+                plural='volumesnapshots',
+                name=golden_snapshot_name(version)
+            )
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            snapshot = {'status': {'error': {'message': f'snapshot missing in {namespace}'}}}
+        status = snapshot.get('status') or {}
+        if status.get('error'):
+            if r.delete(GOLDEN_PENDING):
+                r.hset(golden_version_key(version), mapping={
+                    'status': 'failed',
+                    'error': status['error'].get('message', 'snapshot failed')
+                })
+                delete_golden_snapshots(version)
+                logger.error(f"❌ Golden workspace v{version} failed in {namespace}")
+            return
+        if not status.get('readyToUse'):
+            return
+    
+    # Only promote if no newer refresh replaced this version meanwhile
+    if not r.eval(PROMOTE_GOLDEN_SCRIPT, 3, GOLDEN_PENDING, GOLDEN_CURRENT, golden_version_key(version),
+                  version, datetime.utcnow().isoformat()):
+        return
+    logger.info(f"✅ Golden workspace v{version} is now current")
+    
+    # Keep a few old versions: PVCs created just before promotion may still be cloning
+    for old in range(int(version) - 1, 0, -1):
+        status = r.hget(golden_version_key(old), 'status')
+        if status == 'current':
+            r.hset(golden_version_key(old), 'status', 'retired')
+            status = 'retired'
+        if status == 'retired' and old <= int(version) - GOLDEN_KEEP_VERSIONS:
+            delete_golden_snapshots(old)
+            r.hset(golden_version_key(old), 'status', 'pruned')
+
+
+def golden_versions(limit=10):
+    latest = int(r.get(GOLDEN_SEQ) or 0)
+    versions = []
+    for version in range(latest, max(latest - limit, 0), -1):
+        meta = r.hgetall(golden_version_key(version))
+        if meta:
+            versions.append({'version': version, **meta})
+    return versions
+
+
+# ----------------------------------------------------------------------------
+# Time-to-ready: cloned vs empty workspaces
+# ----------------------------------------------------------------------------
+
+def ready_kind(workspace_source):
+    return 'empty' if workspace_source in (None, 'empty') else 'cloned'
+
+
+def record_time_to_ready(session_uuid, seconds, workspace_source):
+    kind = ready_kind(workspace_source)
+    with r.pipeline(transaction=False) as pipe:  # Spans slots; no MULTI on a cluster
+        pipe.hset(session_key(session_uuid), 'time_to_ready', f"{seconds:.1f}")
+        pipe.hincrby('ready:stats', f'{kind}:count', 1)
+        pipe.hincrbyfloat('ready:stats', f'{kind}:sum', seconds)
+        pipe.lpush(f'ready:samples:{kind}', f"{seconds:.1f}")
+        pipe.ltrim(f'ready:samples:{kind}', 0, READY_SAMPLES - 1)
+        pipe.zrem('ready:pending', session_uuid)
+        pipe.execute()
+    log_event(session_uuid, 'session_ready', {'time_to_ready': round(seconds, 1), 'workspace_source': workspace_source})
+    logger.info(f"⏱️ {session_uuid} ready in {seconds:.1f}s ({workspace_source})")
+
+
+def track_time_to_ready():
+    """Record how long each new session took to get its first ready pod"""
+    now = time.time()
+    by_namespace = {}
+    for session_uuid, created in r.zrange('ready:pending', 0, 199, withscores=True):
+        session_data = r.hgetall(session_key(session_uuid))
+        if not session_data:
+            r.zrem('ready:pending', session_uuid)
+            continue
+        if now - created > READY_TRACK_TIMEOUT:
+            r.zrem('ready:pending', session_uuid)
+            r.hincrby('ready:stats', f"{ready_kind(session_data.get('workspace_source'))}:timeouts", 1)
+            continue
+        by_namespace.setdefault(session_namespace(session_data), {})[session_uuid] = (created, session_data)
+    
+    for namespace, pending in by_namespace.items():
+        # One list call per namespace using a set-based selector over the pending sessions
+        deployments = v1.list_namespaced_deployment(
+            namespace=namespace,
+            label_selector=f"session-uuid in ({','.join(pending)})"
+        )
+        for deployment in deployments.items:
+            session_uuid = deployment.metadata.labels.get('session-uuid')
+            if session_uuid in pending and deployment.status.ready_replicas:
+                created, session_data = pending[session_uuid]
+                record_time_to_ready(session_uuid, now - created, session_data.get('workspace_source'))
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_to_ready_stats():
+    stats = r.hgetall('ready:stats')
+    report = {}
+    for kind in ('cloned', 'empty'):
+        count = int(stats.get(f'{kind}:count', 0))
+        samples = [float(s) for s in r.lrange(f'ready:samples:{kind}', 0, -1)]
+        report[kind] = {
+            'count': count,
+            'timeouts': int(stats.get(f'{kind}:timeouts', 0)),
+            'avg_seconds': round(float(stats.get(f'{kind}:sum', 0)) / count, 1) if count else None,
+            'p50_seconds': percentile(samples, 0.5) if samples else None,
+            'p95_seconds': percentile(samples, 0.95) if samples else None
+        }
+    report['pending'] = r.zcard('ready:pending')
+    return report
+
+
+def run_ready_tracker():
+    """Background loop for time-to-ready tracking and golden snapshot promotion"""
+    while True:
+        time.sleep(READY_TRACK_INTERVAL)
+        if not r:
+            continue
+        try:
+            if not r.set('ready-lock', WORKER_ID, nx=True, ex=int(READY_TRACK_INTERVAL * 4)):
+                continue
+            if GOLDEN_MODE == 'snapshot':
+                promote_golden()
+            track_time_to_ready()
+        except Exception as e:
+            logger.warning(f"Ready tracking failed: {str(e)}")
+        finally:
+            if r and r.get('ready-lock') == WORKER_ID:
+                r.delete('ready-lock')
+
+
+if READY_TRACKER_ENABLED:
+    threading.Thread(target=run_ready_tracker, name='ready-tracker', daemon=True).start()
+
 
-@app.route('/session/<session_uuid>/wake', methods=['POST'])
+@app.route('/admin/golden', methods=['GET'])
 @require_api_key
 @handle_errors
-@rate_limit(max_requests=50, window=60)
-def wake_session(session_uuid):
-    """Wake up sleeping pod"""
+def golden_status():
+    """Current golden workspace version, recent versions and time-to-ready comparison"""
     if not r:
         return {'error': 'Redis unavailable'}, 503
     
-    session_data = check_session_exists(session_uuid)
-    
-    try:
-        # Scale deployment to 1
-        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
-        if deployment.spec.replicas == 0:
-            deployment.spec.replicas = 1
-            v1.patch_namespaced_deployment(
-                name=f"user-{session_uuid}",
-                namespace="default",
-                body=deployment
-            )
-            logger.info(f"⏰ Waking up session: {session_uuid}")
-        
-        r.hset(f'session:{session_uuid}', 'last_activity', datetime.utcnow().isoformat())
-        r.hset(f'session:{session_uuid}', 'status', 'running')
-        set_session_ttl(session_uuid)
-        
-        log_event(session_uuid, 'session_woken', {'user_id': session_data.get('user_id')})
-        
-        return jsonify({
-            'uuid': session_uuid,
-            'action': 'wake',
-            'status': 'waking'
-        }), 200
-    except Exception as e:
-        logger.error(f"❌ Failed to wake session: {str(e)}", exc_info=True)
-        raise
+    current = r.get(GOLDEN_CURRENT)
+    pending = r.get(GOLDEN_PENDING)
+    return jsonify({
+        'mode': GOLDEN_MODE,
+        'source_pvc': GOLDEN_SOURCE_PVC,
+        'current': int(current) if current else None,
+        'pending': int(pending) if pending else None,
+        'versions': golden_versions(),
+        'time_to_ready': time_to_ready_stats()
+    }), 200
 
-@app.route('/session/<session_uuid>/status')
+
+@app.route('/admin/golden/refresh', methods=['POST'])
 @require_api_key
 @handle_errors
-@rate_limit(max_requests=200, window=60)
-def session_status(session_uuid):
-    """Get current session status"""
+def golden_refresh():
+    """Snapshot the golden source PVC as a new version ({"source_pvc": "..."} to override)"""
     if not r:
         return {'error': 'Redis unavailable'}, 503
+    if GOLDEN_MODE != 'snapshot':
+        return {'error': f'Golden snapshots are disabled (GOLDEN_MODE={GOLDEN_MODE})'}, 409
     
-    session_data = check_session_exists(session_uuid)
-    queue_length = r.llen(f'queue:{session_uuid}')
+    body = request.get_json(silent=True) or {}
+    source_pvc = body.get('source_pvc', GOLDEN_SOURCE_PVC)
+    version = refresh_golden(source_pvc)
+    return jsonify({
+        'version': version,
+        'status': 'snapshotting',
+        'source_pvc': source_pvc,
+        'namespaces': golden_namespaces()
+    }), 202
+
+
+# ============================================================================
+# KEDA EXTERNAL SCALER - Activity data served to KEDA by keda_scaler.py
+# ============================================================================
+
+def session_activity(session_uuid):
+    """Scaling signal for a session: should its pod run, and how much work is waiting"""
+    session_data = r.hgetall(session_key(session_uuid))
+    if not session_data:
+        return {'active': False, 'pending': 0, 'idle_seconds': None}
+    
+    pending = r.llen(session_key(session_uuid, 'queue')) + r.llen(session_key(session_uuid, 'processing'))
+    last_activity = session_data.get('last_activity') or session_data.get('created_at')
+    idle = (datetime.utcnow() - datetime.fromisoformat(last_activity)).total_seconds()
+    
+    # Queued messages always need the pod; otherwise it runs until slept or idle.
+    # Hibernated workspaces stay down until their PVC is restored.
+    idle_down = pending == 0 and (session_data.get('status') == 'sleeping' or idle >= SCALE_IDLE_SECONDS)
+    active = not idle_down and not session_data.get('storage')
     
+    if idle_down and session_data.get('autoscaler') == 'keda':
+        # KEDA is taking the pod to zero: free its compute for queued creates.
+        # commit_running takes it back on the next chat or wake. A session that
+        # is only down while its storage restores keeps what its wake committed.
+        release_capacity(session_uuid, COMPUTE_KEYS)
+    return {'active': active, 'pending': pending, 'idle_seconds': int(idle)}
+
+
+def keda_managed(session_uuid, session_data, namespace):
+    """True if KEDA scales this session's pod; backfills ScaledObjects for sessions created without one.
+    
+    A backfilled session still returns False once, so the caller scales this
+    activation itself while KEDA picks up the new ScaledObject.
+    """
+    if not KEDA_SCALER_ENABLED:
+        return False
+    if session_data.get('autoscaler') == 'keda':
+        return True
     try:
-        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
-        replicas = deployment.status.replicas or 0
+        custom_api.create_namespaced_custom_object(
+            group="keda.sh", version="v1alpha1", namespace=namespace,
+            plural="scaledobjects", body=build_user_scaledobject(session_uuid)
+        )
+        logger.info(f"✅ KEDA ScaledObject backfilled: user-{session_uuid}-scaler")
     except ApiException as e:
-        logger.warning(f"Deployment not found: {session_uuid}")
-        replicas = 0
-    
-    return jsonify({
-        'uuid': session_uuid,
-        'session': session_data,
-        'queue_length': queue_length,
-        'replicas': replicas,
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+        if e.status != 409:
+            logger.warning(f"Failed to backfill ScaledObject for {session_uuid}: {e.reason}")
+            return False
+    r.hset(session_key(session_uuid), 'autoscaler', 'keda')
+    return False
+
+
+def notify_activity(session_uuid):
+    """Push an activity change to the scaler's StreamIsActive streams"""
+    if not KEDA_SCALER_ENABLED:
+        return
+    try:
+        r.publish('scaler:activity', session_uuid)
+    except Exception as e:
+        logger.warning(f"Failed to publish activity for {session_uuid}: {str(e)}")
 
 
 # ============================================================================
@@ -444,31 +2624,38 @@ def chat_message(session_uuid):
         return {'error': 'Redis unavailable'}, 503
     
     session_data = check_session_exists(session_uuid)
+    namespace = session_namespace(session_data)
     message = request.json.get('message', '')
     
     if not message:
         raise ValueError("message is required")
     
-    logger.info(f"💬 Chat message for {session_uuid}: {message[:50]}...")
+    logger.info(f"💬 Chat message for {session_uuid}", extra={'sampled': True, 'message_length': len(message)})
     
     try:
-        # Push message to user's queue
-        r.lpush(f'queue:{session_uuid}', 'chat')
-        
-        # WORKAROUND: Manually scale to 1 since KEDA 0→1 scaling doesn't work with auth
-        # KEDA will handle 1→0 scaling after cooldown period
-        try:
-            deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
-            if deployment.spec.replicas == 0:
-                deployment.spec.replicas = 1
-                v1.patch_namespaced_deployment(
-                    name=f"user-{session_uuid}",
-                    namespace="default",
-                    body=deployment
-                )
-                logger.info(f"⚡ Manually scaled deployment to 1: user-{session_uuid}")
-        except ApiException as e:
-            logger.warning(f"Failed to scale deployment: {str(e)}")
+        ready = False
+        if session_data.get('storage'):
+            # Archived workspace: the message waits in the queue until the PVC is restored
+            if session_data['storage'] == 'archived':
+                request_restore(session_uuid, session_data)
+        elif not migration_pending(session_uuid, session_data):
+            # Mid-move sessions skip this: the message waits until the pod starts in the new namespace
+            try:
+                deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
+                if deployment.spec.replicas == 0 and not keda_managed(session_uuid, session_data, namespace):
+                    # Without a ScaledObject nothing else scales 0→1, so do it here
+                    deployment.spec.replicas = 1
+                    v1.patch_namespaced_deployment(
+                        name=f"user-{session_uuid}",
+                        namespace=namespace,
+                        body=deployment
+                    )
+                    logger.info(f"⚡ Manually scaled deployment to 1: user-{session_uuid}")
+                else:
+                    ready = bool(deployment.status.ready_replicas)
+            except (ApiException, DependencyUnavailable, DeadlineExceeded) as e:
+                # Still queue the message; delivery catches up once Kubernetes answers
+                logger.warning(f"Failed to scale deployment: {str(e)}")
         
         # Store chat message in session queue with timestamp
         chat_record = {
@@ -476,41 +2663,45 @@ def chat_message(session_uuid):
             'type': 'user_message',
             'content': message
         }
-        r.lpush(f'chat:{session_uuid}', json.dumps(chat_record))
-        r.ltrim(f'chat:{session_uuid}', 0, 999)  # Keep last 1000 messages
+        r.lpush(session_key(session_uuid, 'chat'), json.dumps(chat_record))
+        r.ltrim(session_key(session_uuid, 'chat'), 0, 999)  # Keep last 1000 messages
         
-        # Update activity
-        r.hset(f'session:{session_uuid}', 'last_activity', datetime.utcnow().isoformat())
-        set_session_ttl(session_uuid)
+        # Update activity first, so the scaler doesn't release what we commit next
+        r.hset(session_key(session_uuid), mapping={
+            'last_activity': datetime.utcnow().isoformat(),
+            'status': 'running'
+        })
+        commit_running(session_uuid, session_data)
         
         log_event(session_uuid, 'chat_received', {'message_length': len(message)})
         
-        # Wait briefly for pod to start
-        time.sleep(0.5)
-        
-        # Try to forward to user pod
-        try:
-            deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
-            if deployment.status.replicas and deployment.status.replicas > 0:
-                pod_service = f"user-{session_uuid}.default.svc.cluster.local"
-                response = requests.post(
-                    f"http://{pod_service}:80/chat",
-                    json={"message": message},
-                    timeout=5
-                )
-                logger.info(f"✅ Message forwarded to pod: {session_uuid}")
+        # Deliver inline when the pod is up and nothing is queued ahead of this message
+        if ready and r.llen(session_key(session_uuid, 'queue')) == 0 and r.llen(session_key(session_uuid, 'processing')) == 0:
+            message_id = uuid.uuid4().hex[:12]
+            try:
+                with requests.Session() as http:
+                    pod_response = forward_to_pod(http, session_uuid, namespace, message)
+                store_reply(session_uuid, message_id, pod_response)
+                set_session_ttl(session_uuid)
+                logger.info(f"✅ Message forwarded to pod: {session_uuid}", extra={'sampled': True})
                 return jsonify({
                     'uuid': session_uuid,
+                    'message_id': message_id,
                     'status': 'processed',
-                    'pod_response': response.json() if response.ok else None
+                    'pod_response': pod_response
                 }), 200
-        except Exception as e:
-            logger.warning(f"Pod not ready yet: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Direct delivery failed, queueing: {str(e)}")
+        
+        message_id = enqueue_message(session_uuid, message)
+        set_session_ttl(session_uuid)
+        notify_activity(session_uuid)
         
         return jsonify({
             'uuid': session_uuid,
+            'message_id': message_id,
             'status': 'queued',
-            'message': 'Pod is waking up, message queued'
+            'message': 'Pod is waking up, message queued for delivery'
         }), 202
         
     except Exception as e:
@@ -518,10 +2709,126 @@ def chat_message(session_uuid):
         raise
 
 
+@app.route('/session/<session_uuid>/replies')
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=200, window=60)
+def session_replies(session_uuid):
+    """Fetch pod replies for delivered messages (newest first)"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    check_session_exists(session_uuid)
+    limit = min(int(request.args.get('limit', 50)), 1000)
+    
+    replies = [json.loads(reply) for reply in r.lrange(session_key(session_uuid, 'replies'), 0, limit - 1)]
+    
+    return jsonify({
+        'uuid': session_uuid,
+        'replies': replies,
+        'queue_length': r.llen(session_key(session_uuid, 'queue')),
+        'in_flight': r.llen(session_key(session_uuid, 'processing')),
+        'dead_lettered': r.llen(session_key(session_uuid, 'dlq'))
+    }), 200
+
+
+@app.route('/session/<session_uuid>/dead-letters/retry', methods=['POST'])
+@require_api_key
+@handle_errors
+@rate_limit(max_requests=20, window=60)
+def retry_dead_letters(session_uuid):
+    """Move dead-lettered messages back onto the delivery queue"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    check_session_exists(session_uuid)
+    
+    requeued = 0
+    dropped = 0
+    while True:
+        raw = r.rpop(session_key(session_uuid, 'dlq'))
+        if raw is None:
+            break
+        item = json.loads(raw)
+        if 'message' not in item:
+            dropped += 1  # Undecodable queue item; nothing to deliver
+            continue
+        item['attempts'] = 0
+        r.lpush(session_key(session_uuid, 'queue'), json.dumps(item))
+        requeued += 1
+    
+    if requeued:
+        r.sadd('delivery:pending', session_uuid)
+        log_event(session_uuid, 'dead_letters_requeued', {'count': requeued})
+    
+    return jsonify({
+        'uuid': session_uuid,
+        'requeued': requeued,
+        'dropped': dropped
+    }), 200
+
+
 # ============================================================================
 # PRIORITY 1: SESSION CLEANUP - Delete/Terminate session
 # ============================================================================
 
+def build_backup_job(session_uuid, ttl=300):
+    """Job that zips pvc-{uuid} into backup-pvc before the PVC is deleted"""
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(
+            name=f"backup-{session_uuid}",
+            labels={"session-uuid": session_uuid, "job-type": "backup"}
+        ),
+        spec=client.V1JobSpec(
+            ttl_seconds_after_finished=ttl,
+            template=client.V1PodTemplateSpec(
+                spec=client.V1PodSpec(
+                    restart_policy="Never",
+                    containers=[
+                        client.V1Container(
+                            name="backup",
+                            image="alpine:latest",
+                            command=["/bin/sh", "-c"],
+                            args=[
+                                f"apk add --no-cache zip && "
+                                f"cd /app && "
+                                f"zip -r /backup/app-{session_uuid}-$(date +%Y%m%d-%H%M%S).zip . && "
+                                f"ls -lh /backup/ && "
+                                f"echo 'Backup completed for {session_uuid}'"
+                            ],
+                            volume_mounts=[
+                                client.V1VolumeMount(
+                                    name="user-data",
+                                    mount_path="/app",
+                                    read_only=True
+                                ),
+                                client.V1VolumeMount(
+                                    name="backup-storage",
+                                    mount_path="/backup"
+                                )
+                            ]
+                        )
+                    ],
+                    volumes=[
+                        client.V1Volume(
+                            name="user-data",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name=f"pvc-{session_uuid}"
+                            )
+                        ),
+                        client.V1Volume(
+                            name="backup-storage",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name="backup-pvc"  # Shared backup storage (one per workspace namespace)
+                            )
+                        )
+                    ]
+                )
+            )
+        )
+    )
+
+
 @app.route('/session/<session_uuid>', methods=['DELETE'])
 @require_api_key
 @handle_errors
@@ -533,6 +2840,7 @@ def delete_session(session_uuid):
     
     try:
         session_data = check_session_exists(session_uuid)
+        namespace = session_namespace(session_data)
         user_id = session_data.get('user_id', 'unknown')
     except ValueError:
         logger.warning(f"Session not found for deletion: {session_uuid}")
@@ -541,75 +2849,27 @@ def delete_session(session_uuid):
     logger.info(f"🗑️ Deleting session: {session_uuid}")
     
     try:
-        # Backup PVC data before deletion
+        # Backup PVC data before deletion (an archived workspace has no PVC; its archive is pruned)
         try:
+            if session_data.get('storage') == 'archived':
+                raise Exception("workspace is archived, no PVC to back up")
             logger.info(f"💾 Starting PVC backup for: {session_uuid}")
             
             # Create backup job to zip and upload data
-            backup_job = client.V1Job(
-                metadata=client.V1ObjectMeta(
-                    name=f"backup-{session_uuid}",
-                    labels={"session-uuid": session_uuid, "job-type": "backup"}
-                ),
-                spec=client.V1JobSpec(
-                    ttl_seconds_after_finished=300,  # Auto-delete after 5 min
-                    template=client.V1PodTemplateSpec(
-                        spec=client.V1PodSpec(
-                            restart_policy="Never",
-                            containers=[
-                                client.V1Container(
-                                    name="backup",
-                                    image="alpine:latest",
-                                    command=["/bin/sh", "-c"],
-                                    args=[
-                                        f"apk add --no-cache zip && "
-                                        f"cd /app && "
-                                        f"zip -r /backup/app-{session_uuid}-$(date +%Y%m%d-%H%M%S).zip . && "
-                                        f"ls -lh /backup/ && "
-                                        f"echo 'Backup completed for {session_uuid}'"
-                                    ],
-                                    volume_mounts=[
-                                        client.V1VolumeMount(
-                                            name="user-data",
-                                            mount_path="/app",
-                                            read_only=True
-                                        ),
-                                        client.V1VolumeMount(
-                                            name="backup-storage",
-                                            mount_path="/backup"
-                                        )
-                                    ]
-                                )
-                            ],
-                            volumes=[
-                                client.V1Volume(
-                                    name="user-data",
-                                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                                        claim_name=f"pvc-{session_uuid}"
-                                    )
-                                ),
-                                client.V1Volume(
-                                    name="backup-storage",
-                                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                                        claim_name="backup-pvc"  # Shared backup storage
-                                    )
-                                )
-                            ]
-                        )
-                    )
-                )
-            )
+            backup_job = build_backup_job(session_uuid)
             
-            batch_v1 = client.BatchV1Api()
-            batch_v1.create_namespaced_job(namespace="default", body=backup_job)
+            batch_v1.create_namespaced_job(namespace=namespace, body=backup_job)
             logger.info(f"✅ Backup job created: backup-{session_uuid}")
             
-            # Wait for backup to complete (max 60 seconds)
+            # Wait for backup to complete (max 60 seconds, keeping 10s of the request budget for the deletes)
             import time
             for i in range(12):  # 12 * 5 = 60 seconds
+                if time_left() < 15:
+                    logger.warning(f"⚠️ Backup still running at request deadline, continuing: {session_uuid}")
+                    break
                 time.sleep(5)
                 try:
-                    job = batch_v1.read_namespaced_job(name=f"backup-{session_uuid}", namespace="default")
+                    job = batch_v1.read_namespaced_job(name=f"backup-{session_uuid}", namespace=namespace)
                     if job.status.succeeded:
                         logger.info(f"✅ Backup completed: {session_uuid}")
                         break
@@ -626,7 +2886,7 @@ def delete_session(session_uuid):
         try:
             v1.delete_namespaced_deployment(
                 name=f"user-{session_uuid}",
-                namespace="default",
+                namespace=namespace,
                 body=client.V1DeleteOptions(grace_period_seconds=30)
             )
             logger.info(f"✅ Deployment deleted: user-{session_uuid}")
@@ -639,7 +2899,7 @@ def delete_session(session_uuid):
         try:
             core_v1.delete_namespaced_service(
                 name=f"user-{session_uuid}",
-                namespace="default"
+                namespace=namespace
             )
             logger.info(f"✅ Service deleted: user-{session_uuid}")
         except ApiException as e:
@@ -649,10 +2909,9 @@ def delete_session(session_uuid):
         
         # Delete Ingress
         try:
-            networking_v1 = client.NetworkingV1Api()
             networking_v1.delete_namespaced_ingress(
                 name=f"user-{session_uuid}",
-                namespace="default"
+                namespace=namespace
             )
             logger.info(f"✅ Ingress deleted: user-{session_uuid}")
         except ApiException as e:
@@ -665,7 +2924,7 @@ def delete_session(session_uuid):
             custom_api.delete_namespaced_custom_object(
                 group="keda.sh",
                 version="v1alpha1",
-                namespace="default",
+                namespace=namespace,
                 plural="scaledobjects",
                 name=f"user-{session_uuid}-scaler"
             )
@@ -679,7 +2938,7 @@ def delete_session(session_uuid):
         try:
             core_v1.delete_namespaced_persistent_volume_claim(
                 name=f"pvc-{session_uuid}",
-                namespace="default"
+                namespace=namespace
             )
             logger.info(f"✅ PVC deleted: pvc-{session_uuid}")
         except ApiException as e:
@@ -688,10 +2947,15 @@ def delete_session(session_uuid):
             logger.warning(f"PVC not found: pvc-{session_uuid}")
         
         # Clean up Redis data (TriggerAuthentication is shared, don't delete)
-        r.delete(f'session:{session_uuid}')
-        r.delete(f'queue:{session_uuid}')
-        r.delete(f'chat:{session_uuid}')
-        r.delete(f'events:{session_uuid}')
+        release_capacity(session_uuid)
+        r.delete(*session_keys(session_uuid))  # One slot, so one DEL even on a cluster
+        r.srem('delivery:pending', session_uuid)
+        r.zrem(f'storage:restores:{namespace}', session_uuid)
+        r.zrem(f'storage:retries:{namespace}', session_uuid)
+        r.zrem(f'storage:hibernations:{namespace}', session_uuid)
+        r.zrem('ready:pending', session_uuid)
+        if session_data.get('storage'):
+            r.set(f'storage:prune:{namespace}', 1)  # Its archive goes with the next prune
         logger.info(f"✅ Redis data cleaned: {session_uuid}")
         
         log_event(session_uuid, 'session_terminated', {'user_id': user_id})
@@ -721,6 +2985,7 @@ def scale_session(session_uuid):
         return {'error': 'Redis unavailable'}, 503
     
     session_data = check_session_exists(session_uuid)
+    namespace = session_namespace(session_data)
     
     scale_type = request.json.get('scale', 'up')  # 'up' or 'down'
     
@@ -728,29 +2993,27 @@ def scale_session(session_uuid):
         raise ValueError("scale must be 'up' or 'down'")
     
     try:
-        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
+        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
         
+        # Scale up: 1Gi RAM, 1 CPU; scale down: 512Mi RAM, 0.5 CPU
+        deployment.spec.template.spec.containers[0].resources = pod_resources(scale_type)
         if scale_type == 'up':
-            # Scale up: 1Gi RAM, 1 CPU
-            deployment.spec.template.spec.containers[0].resources = client.V1ResourceRequirements(
-                requests={"memory": "1Gi", "cpu": "1000m"},
-                limits={"memory": "2Gi", "cpu": "2000m"}
-            )
             logger.info(f"⬆️ Scaling up: {session_uuid}")
         else:
-            # Scale down: 512Mi RAM, 0.5 CPU
-            deployment.spec.template.spec.containers[0].resources = client.V1ResourceRequirements(
-                requests={"memory": "512Mi", "cpu": "500m"},
-                limits={"memory": "1Gi", "cpu": "1000m"}
-            )
             logger.info(f"⬇️ Scaling down: {session_uuid}")
         
         v1.patch_namespaced_deployment(
             name=f"user-{session_uuid}",
-            namespace="default",
+            namespace=namespace,
             body=deployment
         )
         
+        # Track the new requests against the admission budget
+        if session_data.get('status') != 'sleeping':
+            release_capacity(session_uuid, COMPUTE_KEYS)
+            reserve_capacity(session_uuid, session_resources(scale_type, storage=False), force=True)
+        r.hset(session_key(session_uuid), 'profile', scale_type)
+        
         log_event(session_uuid, f'scaled_{scale_type}', {'user_id': session_data.get('user_id')})
         
         return jsonify({
@@ -779,26 +3042,30 @@ def sleep_session(session_uuid):
         return {'error': 'Redis unavailable'}, 503
     
     session_data = check_session_exists(session_uuid)
+    namespace = session_namespace(session_data)
     
     try:
-        # Clear the queue
-        r.delete(f'queue:{session_uuid}')
-        
+        # Queued messages are kept and delivered after the next wake
         # Scale deployment to 0
-        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace="default")
+        deployment = v1.read_namespaced_deployment(name=f"user-{session_uuid}", namespace=namespace)
         deployment.spec.replicas = 0
         v1.patch_namespaced_deployment(
             name=f"user-{session_uuid}",
-            namespace="default",
+            namespace=namespace,
             body=deployment
         )
         
         logger.info(f"😴 Putting session to sleep: {session_uuid}")
         
-        # Update session status
-        r.hset(f'session:{session_uuid}', 'status', 'sleeping')
+        # Update session status; the PVC stays, so only compute is released
+        release_capacity(session_uuid, COMPUTE_KEYS)
+        r.hset(session_key(session_uuid), mapping={
+            'status': 'sleeping',
+            'sleeping_since': datetime.utcnow().isoformat()
+        })
         set_session_ttl(session_uuid)
         
+        notify_activity(session_uuid)
         log_event(session_uuid, 'session_sleeping', {'user_id': session_data.get('user_id')})
         
         return jsonify({
@@ -813,6 +3080,528 @@ def sleep_session(session_uuid):
         raise
 
 
+# ============================================================================
+# NAMESPACE REBALANCING - Move sessions after workspace namespaces change
+# ============================================================================
+
+# Moves run in a background worker, one resumable step at a time; the state
+# lives in the session hash (migration_* fields) so any replica can pick it up:
+#   queued     waiting for the worker (a wake or chat now cancels the move)
+#   deleting   volume set to Retain, source objects being deleted
+#   releasing  waiting for the source PVC to go before pre-binding the volume to the target
+#   creating   recreating the PVC and objects in the target namespace
+# migrations:pending holds the sessions to advance, scored by next attempt time.
+
+MIGRATION_FIELDS = [
+    'migration_step', 'migration_from', 'migration_to', 'migration_pv', 'migration_storage_class',
+    'migration_reclaim_policy', 'migration_queued_at', 'migration_updated_at',
+    'migration_attempts', 'migration_error'
+]
+
+
+def queue_migration(session_uuid, source, target):
+    now = datetime.utcnow().isoformat()
+    r.hset(session_key(session_uuid), mapping={
+        'migration_step': 'queued',
+        'migration_from': source,
+        'migration_to': target,
+        'migration_queued_at': now,
+        'migration_updated_at': now
+    })
+    r.zadd('migrations:pending', {session_uuid: time.time()})
+    log_event(session_uuid, 'migration_queued', {'from': source, 'to': target})
+
+
+def end_migration(session_uuid):
+    r.hdel(session_key(session_uuid), *MIGRATION_FIELDS)
+    r.zrem('migrations:pending', session_uuid)
+
+
+def migration_pending(session_uuid, session_data):
+    """True while a move holds the session's objects; a move that hasn't started is cancelled"""
+    step = session_data.get('migration_step')
+    if step == 'queued':
+        end_migration(session_uuid)
+        log_event(session_uuid, 'migration_cancelled', {'reason': 'session in use'})
+        return False
+    return bool(step)
+
+
+def migration_progress(session_data):
+    return {
+        'step': session_data.get('migration_step'),
+        'from': session_data.get('migration_from'),
+        'to': session_data.get('migration_to'),
+        'queued_at': session_data.get('migration_queued_at'),
+        'updated_at': session_data.get('migration_updated_at'),
+        'attempts': int(session_data.get('migration_attempts') or 0),
+        'error': session_data.get('migration_error')
+    }
+
+
+def set_migration_step(session_uuid, step):
+    r.hset(session_key(session_uuid), mapping={
+        'migration_step': step,
+        'migration_updated_at': datetime.utcnow().isoformat()
+    })
+    return step
+
+
+def advance_migration(session_uuid):
+    """Run a move's remaining steps until it finishes or has to wait; safe to repeat after a failure"""
+    session_data = r.hgetall(session_key(session_uuid))
+    step = session_data.get('migration_step')
+    if not step:
+        r.zrem('migrations:pending', session_uuid)  # Deleted or cancelled
+        return
+    source, target = session_data['migration_from'], session_data['migration_to']
+    
+    if step == 'queued':
+        if session_data.get('status') != 'sleeping' or session_data.get('storage'):
+            end_migration(session_uuid)  # Woken or archived since it was queued
+            return
+        pvc = core_v1.read_namespaced_persistent_volume_claim(name=f"pvc-{session_uuid}", namespace=source)
+        pv_name = pvc.spec.volume_name
+        if not pv_name:
+            raise ValueError(f"pvc-{session_uuid} is not bound to a volume")
+        pv = core_v1.read_persistent_volume(name=pv_name)
+        
+        # Recorded before patching, so a retry never takes our Retain for the original policy
+        r.hsetnx(session_key(session_uuid), 'migration_reclaim_policy', pv.spec.persistent_volume_reclaim_policy)
+        r.hset(session_key(session_uuid), mapping={
+            'migration_pv': pv_name,
+            'migration_storage_class': pv.spec.storage_class_name or ''
+        })
+        logger.info(f"🚚 Migrating session {session_uuid}: {source} → {target} (pv: {pv_name})")
+        
+        # Keep the volume when the old claim goes away
+        core_v1.patch_persistent_volume(name=pv_name, body={'spec': {'persistentVolumeReclaimPolicy': 'Retain'}})
+        step = set_migration_step(session_uuid, 'deleting')
+    
+    if step == 'deleting':
+        deletions = [
+            lambda: networking_v1.delete_namespaced_ingress(name=f"user-{session_uuid}", namespace=source),
+            lambda: core_v1.delete_namespaced_service(name=f"user-{session_uuid}", namespace=source),
+            lambda: custom_api.delete_namespaced_custom_object(
+                group="keda.sh", version="v1alpha1", namespace=source,
+                plural="scaledobjects", name=f"user-{session_uuid}-scaler"
+            ),
+            lambda: v1.delete_namespaced_deployment(name=f"user-{session_uuid}", namespace=source),
+            lambda: core_v1.delete_namespaced_persistent_volume_claim(name=f"pvc-{session_uuid}", namespace=source),
+        ]
+        for delete in deletions:
+            try:
+                delete()
+            except ApiException as e:
+                if e.status != 404:
+                    raise
+        step = set_migration_step(session_uuid, 'releasing')
+    
+    session_data = r.hgetall(session_key(session_uuid))
+    pv_name = session_data['migration_pv']
+    
+    if step == 'releasing':
+        try:
+            core_v1.read_namespaced_persistent_volume_claim(name=f"pvc-{session_uuid}", namespace=source)
+            return  # Still terminating; checked again next tick
+        except ApiException as e:
+            if e.status != 404:
+                raise
+        # Hand the volume straight to the target claim; a cleared claimRef would leave this
+        # workspace Available to any other session's new PVC until the claim is created
+        core_v1.patch_persistent_volume(name=pv_name, body={'spec': {'claimRef': {
+            'namespace': target,
+            'name': f"pvc-{session_uuid}",
+            'uid': None,
+            'resourceVersion': None
+        }}})
+        step = set_migration_step(session_uuid, 'creating')
+    
+    if step == 'creating':
+        new_pvc = build_user_pvc(session_uuid, volume_name=pv_name)
+        new_pvc.spec.storage_class_name = session_data.get('migration_storage_class') or None
+        creations = [
+            lambda: core_v1.create_namespaced_persistent_volume_claim(namespace=target, body=new_pvc),
+            lambda: v1.create_namespaced_deployment(
+                namespace=target,
+                body=build_user_deployment(
+                    session_uuid, session_data.get('user_id', 'unknown'),
+                    replicas=0, profile=session_data.get('profile') or 'default'
+                )
+            ),
+            lambda: core_v1.create_namespaced_service(namespace=target, body=build_user_service(session_uuid)),
+            lambda: networking_v1.create_namespaced_ingress(namespace=target, body=build_user_ingress(session_uuid)),
+        ]
+        if session_data.get('autoscaler') == 'keda':
+            creations.append(lambda: custom_api.create_namespaced_custom_object(
+                group="keda.sh", version="v1alpha1", namespace=target,
+                plural="scaledobjects", body=build_user_scaledobject(session_uuid)
+            ))
+        for create in creations:
+            try:
+                create()
+            except ApiException as e:
+                if e.status != 409:
+                    raise
+        
+        core_v1.patch_persistent_volume(name=pv_name, body={
+            'spec': {'persistentVolumeReclaimPolicy': session_data['migration_reclaim_policy']}
+        })
+        
+        r.hset(session_key(session_uuid), 'namespace', target)
+        end_migration(session_uuid)
+        log_event(session_uuid, 'session_migrated', {'from': source, 'to': target})
+        logger.info(f"✅ Session migrated: {session_uuid} → {target}")
+        
+        # Woken while moving: start it in its new namespace
+        session_data = r.hgetall(session_key(session_uuid))
+        if session_data.get('status') == 'running':
+            resume_after_restore(session_uuid, session_data, target)
+
+
+def run_migration_worker():
+    """Background loop advancing queued namespace moves"""
+    while True:
+        time.sleep(MIGRATION_INTERVAL)
+        if not r:
+            continue
+        try:
+            if not r.set('migration-lock', WORKER_ID, nx=True, ex=int(MIGRATION_INTERVAL * 12)):
+                continue
+            due = r.zrangebyscore('migrations:pending', '-inf', time.time(), start=0, num=MIGRATION_CONCURRENCY)
+            for session_uuid in due:
+                try:
+                    advance_migration(session_uuid)
+                except Exception as e:
+                    # Every step is idempotent: retry from where it stopped, backing off
+                    attempts = r.hincrby(session_key(session_uuid), 'migration_attempts', 1)
+                    r.hset(session_key(session_uuid), 'migration_error', str(e))
+                    r.zadd('migrations:pending', {session_uuid: time.time() + min(300, MIGRATION_INTERVAL * 2 ** attempts)})
+                    logger.error(f"❌ Migration step failed for {session_uuid} (attempt {attempts}): {str(e)}")
+        except Exception as e:
+            logger.warning(f"Migration sweep failed: {str(e)}")
+        finally:
+            if r and r.get('migration-lock') == WORKER_ID:
+                r.delete('migration-lock')
+
+
+if MIGRATION_WORKER_ENABLED:
+    threading.Thread(target=run_migration_worker, name='migration-worker', daemon=True).start()
+
+
+@app.route('/admin/rebalance', methods=['GET', 'POST'])
+@require_api_key
+@handle_errors
+def rebalance_sessions():
+    """GET the progress of queued moves, or POST to plan (dry_run) or queue moves of
+    sessions onto their hash ring namespace"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    if request.method == 'GET':
+        migrations = []
+        for session_uuid, next_attempt in r.zrange('migrations:pending', 0, -1, withscores=True):
+            progress = migration_progress(r.hgetall(session_key(session_uuid)))
+            migrations.append({'uuid': session_uuid, **progress, 'next_attempt_in': max(round(next_attempt - time.time()), 0)})
+        return jsonify({'pending': len(migrations), 'migrations': migrations}), 200
+    
+    body = request.get_json(silent=True) or {}
+    dry_run = body.get('dry_run', True)
+    limit = int(body.get('limit', 10))
+    
+    moves = []
+    queued = 0
+    for key in iter_session_keys():
+        session_uuid = uuid_from_key(key)
+        session_data = r.hgetall(key)
+        source = session_namespace(session_data)
+        target = namespace_ring.get_node(session_uuid)
+        if source == target:
+            continue
+        
+        move = {'uuid': session_uuid, 'from': source, 'to': target}
+        if session_data.get('migration_step'):
+            move['result'] = 'in_progress'
+            move['migration'] = migration_progress(session_data)
+        elif session_data.get('storage'):
+            # No bound PVC to move while the workspace is archived
+            move['result'] = 'skipped_archived'
+        elif session_data.get('status') != 'sleeping':
+            # Running pods hold their volume; they move after the next sleep
+            move['result'] = 'skipped_running'
+        elif dry_run:
+            move['result'] = 'planned'
+        elif queued >= limit:
+            move['result'] = 'deferred'
+        else:
+            queue_migration(session_uuid, source, target)
+            move['result'] = 'queued'
+            queued += 1
+        moves.append(move)
+    
+    return jsonify({
+        'dry_run': dry_run,
+        'namespaces': namespace_ring.nodes,
+        'misplaced': len(moves),
+        'queued': queued,
+        'moves': moves
+    }), 202 if queued else 200
+
+
+# ============================================================================
+# RECONCILER - Garbage-collect drift between Redis sessions and Kubernetes
+# ============================================================================
+# Sessions expire from Redis after SESSION_TTL and half-failed creates leave
+# objects behind; a periodic sweep lists every session-uuid labelled object
+# and deletes the ones no live session owns.
+
+def typed_page(list_call):
+    """Page through a typed list call, yielding (uuid, name, created) tuples"""
+    def list_page(namespace, token):
+        page = list_call(namespace=namespace, label_selector='session-uuid', limit=500, _continue=token)
+        objects = [(o.metadata.labels['session-uuid'], o.metadata.name, o.metadata.creation_timestamp) for o in page.items]
+        return objects, page.metadata._continue
+    return list_page
+
+
+def scaledobject_page(namespace, token):
+    page = custom_api.list_namespaced_custom_object(
+        group="keda.sh", version="v1alpha1", namespace=namespace, plural="scaledobjects",
+        label_selector='session-uuid', limit=500, _continue=token
+    )
+    objects = [
+        (o['metadata']['labels']['session-uuid'], o['metadata']['name'],
+         datetime.fromisoformat(o['metadata']['creationTimestamp'].replace('Z', '+00:00')))
+        for o in page['items']
+    ]
+    return objects, page['metadata'].get('continue')
+
+
+# Deletion order matters: PVCs go last so nothing still mounts them
+RECONCILED_KINDS = [
+    ('scaledobject', scaledobject_page, lambda name, ns: custom_api.delete_namespaced_custom_object(
+        group="keda.sh", version="v1alpha1", namespace=ns, plural="scaledobjects", name=name)),
+    ('ingress', typed_page(networking_v1.list_namespaced_ingress),
+     lambda name, ns: networking_v1.delete_namespaced_ingress(name=name, namespace=ns)),
+    ('service', typed_page(core_v1.list_namespaced_service),
+     lambda name, ns: core_v1.delete_namespaced_service(name=name, namespace=ns)),
+    ('deployment', typed_page(v1.list_namespaced_deployment),
+     lambda name, ns: v1.delete_namespaced_deployment(name=name, namespace=ns)),
+    ('pvc', typed_page(core_v1.list_namespaced_persistent_volume_claim), lambda name, ns: backup_then_delete_pvc(name, ns)),
+]
+
+
+def backup_then_delete_pvc(name, namespace):
+    """Delete an orphaned PVC once its data is zipped into backup-pvc; False while that is pending"""
+    session_uuid = name[len('pvc-'):]
+    try:
+        job = batch_v1.read_namespaced_job(name=f"backup-{session_uuid}", namespace=namespace)
+    except ApiException as e:
+        if e.status != 404:
+            raise
+        # Kept past the next sweep so its result is still there to read
+        batch_v1.create_namespaced_job(
+            namespace=namespace,
+            body=build_backup_job(session_uuid, ttl=int(RECONCILE_INTERVAL * 3))
+        )
+        logger.info(f"💾 Backing up orphaned PVC before deletion: {namespace}/{name}")
+        return False
+    
+    if job.status.failed:
+        logger.warning(f"⚠️ Backup of orphaned PVC failed, keeping it: {namespace}/{name}")
+        return False
+    if not job.status.succeeded:
+        return False
+    core_v1.delete_namespaced_persistent_volume_claim(name=name, namespace=namespace)
+    return True
+
+
+def list_session_objects(kind, list_page, namespace):
+    """All objects of one kind labelled with a session-uuid in a namespace"""
+    objects, token = [], None
+    while True:
+        try:
+            page, token = list_page(namespace, token)
+        except ApiException as e:
+            if e.status == 404:  # KEDA CRDs not installed
+                return []
+            raise
+        objects.extend(page)
+        if not token:
+            return objects
+
+
+def scan_sessions():
+    """Live sessions from Redis: uuid -> namespaces its objects may be in"""
+    keys = list(iter_session_keys())
+    sessions = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        pipe = r.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hmget(key, 'namespace', 'migration_step', 'migration_from', 'migration_to')
+        for key, (namespace, step, source, target) in zip(chunk, pipe.execute()):
+            owned = {namespace or LEGACY_NAMESPACE}
+            if step:
+                owned |= {source, target}  # Mid-move: objects are in either namespace
+            sessions[uuid_from_key(key)] = owned
+    return sessions
+
+
+def release_stale_reservations(sessions):
+    """Release capacity still held for sessions that expired or half-failed; returns how many"""
+    released = 0
+    cutoff = time.time() - RECONCILE_GRACE_SECONDS
+    for session_uuid, raw in r.hscan_iter(ADMISSION_RESERVED, count=500):
+        if session_uuid in sessions or json.loads(raw).get('at', 0) > cutoff:
+            continue  # Live, or reserved recently enough to still be provisioning
+        if r.exists(session_key(session_uuid)):
+            continue  # Created after the scan
+        release_capacity(session_uuid)
+        released += 1
+    return released
+
+
+def reconcile(dry_run=False, force=False):
+    """One drift sweep; returns the report (also stored in reconcile:last, or reconcile:last_dry_run)"""
+    started = time.time()
+    now = datetime.now(timezone.utc)
+    namespaces = sorted(set(WORKSPACE_NAMESPACES) | {LEGACY_NAMESPACE})
+    
+    sessions = scan_sessions()
+    
+    objects = {kind: 0 for kind, _, _ in RECONCILED_KINDS}
+    orphans = {kind: 0 for kind, _, _ in RECONCILED_KINDS}
+    deployed = set()
+    to_delete = []
+    for kind, list_page, delete in RECONCILED_KINDS:
+        for namespace in namespaces:
+            for session_uuid, name, created in list_session_objects(kind, list_page, namespace):
+                objects[kind] += 1
+                if namespace in sessions.get(session_uuid, ()):
+                    if kind == 'deployment':
+                        deployed.add(session_uuid)
+                    continue
+                if (now - created).total_seconds() < RECONCILE_GRACE_SECONDS:
+                    continue  # May still be mid-create or mid-migration
+                orphans[kind] += 1
+                to_delete.append((kind, delete, name, namespace))
+    
+    # Redis keeps no data across restarts: a wiped keyspace makes every object look orphaned
+    halted = None
+    total_objects, total_orphans = sum(objects.values()), sum(orphans.values())
+    if total_orphans and not sessions:
+        halted = 'no sessions in Redis'
+    elif total_objects and total_orphans / total_objects > RECONCILE_MAX_ORPHAN_RATIO:
+        halted = f'{total_orphans} of {total_objects} objects orphaned'
+    if force:
+        halted = None
+    elif halted:
+        logger.error(f"🛑 Reconcile halted, not deleting anything ({halted}); POST /admin/reconcile with force to override")
+    
+    reservations_released = 0
+    if not dry_run and not halted:
+        reservations_released = release_stale_reservations(sessions)
+        # Committed capacity is the sum of reservations; one script keeps it exact
+        r.eval(RESYNC_SCRIPT, 2, ADMISSION_COMMITTED, ADMISSION_RESERVED)
+    
+    deleted = backups_pending = 0
+    if not dry_run and not halted:
+        for kind, delete, name, namespace in to_delete[:RECONCILE_BATCH_SIZE]:
+            try:
+                if delete(name, namespace) is False:
+                    backups_pending += 1
+                    continue
+                deleted += 1
+                logger.info(f"🧹 Deleted orphaned {kind}: {namespace}/{name}")
+            except ApiException as e:
+                if e.status != 404:
+                    logger.warning(f"Failed to delete orphaned {kind} {namespace}/{name}: {e.reason}")
+            time.sleep(RECONCILE_DELETE_INTERVAL)
+    
+    report = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'dry_run': dry_run,
+        'halted': halted,
+        'duration_seconds': round(time.time() - started, 2),
+        'sessions': len(sessions),
+        'objects': objects,
+        'orphans': orphans,
+        'sessions_without_deployment': len(set(sessions) - deployed),
+        'deleted': deleted,
+        'backups_pending': backups_pending,
+        'deferred': max(len(to_delete) - deleted, 0) if not dry_run else len(to_delete),
+        'reservations_released': reservations_released
+    }
+    r.set('reconcile:last_dry_run' if dry_run else 'reconcile:last', json.dumps(report))
+    logger.info(f"🔁 Reconcile: {sum(orphans.values())} orphans, {deleted} deleted", extra={'report': report})
+    return report
+
+
+def run_reconciler():
+    """Background loop: one replica sweeps per interval, or sooner when a sweep is requested"""
+    while True:
+        time.sleep(RECONCILE_POLL_INTERVAL)
+        if not r:
+            continue
+        try:
+            migrate_keyspace()  # No-op once done; retries if Redis was down at startup
+            requested = r.get('reconcile:requested')
+            if not requested and r.exists('reconcile:scheduled'):
+                continue  # Not due yet
+            if not r.set('reconcile-lock', WORKER_ID, nx=True, ex=int(RECONCILE_INTERVAL)):
+                continue
+            try:
+                options = json.loads(requested) if requested else {}
+                if requested:
+                    r.delete('reconcile:requested')
+                reconcile(dry_run=options.get('dry_run', False), force=options.get('force', False))
+                if not options.get('dry_run'):
+                    r.set('reconcile:scheduled', WORKER_ID, ex=int(RECONCILE_INTERVAL))
+            finally:
+                if r and r.get('reconcile-lock') == WORKER_ID:
+                    r.delete('reconcile-lock')
+        except Exception as e:
+            logger.warning(f"Reconcile sweep failed: {str(e)}")
+
+
+if RECONCILE_ENABLED:
+    threading.Thread(target=run_reconciler, name='reconciler', daemon=True).start()
+
+
+@app.route('/admin/reconcile', methods=['GET', 'POST'])
+@require_api_key
+@handle_errors
+def reconcile_status():
+    """GET the last sweep report (?dry_run=true for the last dry run), or POST to queue a sweep
+    ({"dry_run": true} to only report, {"force": true} to delete even when the orphan guard
+    would halt the sweep); the reconciler runs it within RECONCILE_POLL_INTERVAL"""
+    if not r:
+        return {'error': 'Redis unavailable'}, 503
+    
+    if request.method == 'GET':
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+        last = r.get('reconcile:last_dry_run' if dry_run else 'reconcile:last')
+        report = json.loads(last) if last else {}
+        requested = r.get('reconcile:requested')
+        if requested:
+            report['requested'] = json.loads(requested)  # Queued, not yet picked up
+        return jsonify(report), 200
+    
+    if not RECONCILE_ENABLED:
+        return {'error': 'Reconciler is disabled (RECONCILE_ENABLED=false)'}, 409
+    
+    body = request.get_json(silent=True) or {}
+    options = {
+        'dry_run': bool(body.get('dry_run', False)),
+        'force': bool(body.get('force', False)),
+        'requested_at': datetime.utcnow().isoformat()
+    }
+    r.set('reconcile:requested', json.dumps(options))
+    logger.info("🔁 Reconcile sweep requested", extra={'options': options})
+    return jsonify({'status': 'queued', **options}), 202
+
+
 # ============================================================================
 # MONITORING & METRICS
 # ============================================================================
@@ -827,9 +3616,16 @@ def health():
         except:
             redis_status = "unhealthy"
     
+    breaker_states = breaker_report()
+    degraded = redis_status != 'healthy' or any(
+        b['state'] != 'closed' for b in breaker_states['dependencies'].values()
+    )
+    
+    # Stays 200 so liveness probes don't restart pods over a downstream outage
     return jsonify({
-        'status': 'healthy',
+        'status': 'degraded' if degraded else 'healthy',
         'redis': redis_status,
+        'breakers': breaker_states,
         'version': VERSION,
         'timestamp': datetime.utcnow().isoformat()
     }), 200
@@ -842,24 +3638,44 @@ def get_metrics():
     if not r:
         return {'error': 'Redis unavailable'}, 503
     
-    # Get all sessions using pattern match
-    session_keys = r.keys('session:*')
+    keys = list(iter_session_keys())
     
     metrics = {
-        'total_sessions': len(session_keys),
+        'total_sessions': len(keys),
         'active_sessions': 0,
         'sleeping_sessions': 0,
+        'sessions_by_namespace': {},
         'timestamp': datetime.utcnow().isoformat()
     }
     
-    for key in session_keys:
+    for key in keys:
         session = r.hgetall(key)
+        namespace = session_namespace(session)
+        metrics['sessions_by_namespace'][namespace] = metrics['sessions_by_namespace'].get(namespace, 0) + 1
         if session.get('status') == 'created':
             metrics['active_sessions'] += 1
         elif session.get('status') == 'sleeping':
             metrics['sleeping_sessions'] += 1
     
-    logger.info(f"📊 Metrics: {metrics}")
+    metrics['admission'] = {
+        'committed': {k: int(v) for k, v in r.hgetall(ADMISSION_COMMITTED).items()},
+        'budget': ADMISSION_BUDGET,
+        'queue_depth': int(r.get(ADMISSION_QUEUED) or 0),
+        'queued_users': r.llen(ADMISSION_USERS),
+        'decisions': {k: int(v) for k, v in r.hgetall('admission:decisions').items()}
+    }
+    last_reconcile = r.get('reconcile:last')
+    if last_reconcile:
+        report = json.loads(last_reconcile)
+        metrics['drift'] = {
+            'orphans': report['orphans'],
+            'sessions_without_deployment': report['sessions_without_deployment'],
+            'last_reconcile': report['timestamp']
+        }
+    metrics['time_to_ready'] = time_to_ready_stats()
+    metrics['breakers'] = breaker_report()
+    metrics['log_records_dropped'] = log_handler.dropped
+    logger.info("📊 Metrics collected", extra={'sampled': True, 'total_sessions': metrics['total_sessions']})
     return jsonify(metrics), 200
 
 
@@ -871,16 +3687,16 @@ def list_sessions():
     if not r:
         return {'error': 'Redis unavailable'}, 503
     
-    session_keys = r.keys('session:*')
     sessions = []
     
-    for key in session_keys:
-        session_uuid = key.split(':')[1]
+    for key in iter_session_keys():
+        session_uuid = uuid_from_key(key)
         session_data = r.hgetall(key)
         sessions.append({
             'uuid': session_uuid,
             'user_id': session_data.get('user_id'),
             'status': session_data.get('status'),
+            'namespace': session_namespace(session_data),
             'created_at': session_data.get('created_at'),
             'last_activity': session_data.get('last_activity')
         })
@@ -890,3 +3706,9 @@ def list_sessions():
         'sessions': sessions
     }), 200
 
+
+# Runs last: the migration needs the admission and golden key names defined above
+try:
+    migrate_keyspace()
+except Exception as e:
+    logger.error(f"❌ Keyspace migration failed (retried by the reconciler): {str(e)}")
@@ -0,0 +1,165 @@
+"""KEDA external scaler for user pods, backed by session-manager's activity data.
+
+Runs as a sidecar next to the API (gunicorn workers can't share one gRPC port):
+    python keda_scaler.py                  # Serve ExternalScaler on SCALER_PORT
+    python keda_scaler.py --probe <uuid>   # Act as KEDA against a running scaler
+"""
+import os
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+# The scaler only answers KEDA; background workers stay with the API containers
+os.environ.setdefault('DELIVERY_WORKER_ENABLED', 'false')
+os.environ.setdefault('RECONCILE_ENABLED', 'false')
+os.environ.setdefault('STORAGE_WORKER_ENABLED', 'false')
+os.environ.setdefault('READY_TRACKER_ENABLED', 'false')
+os.environ.setdefault('MIGRATION_WORKER_ENABLED', 'false')
+os.environ.setdefault('ADMISSION_WORKER_ENABLED', 'false')
+
+import app as session_manager
+import externalscaler_pb2 as pb
+import externalscaler_pb2_grpc as pb_grpc
+
+logger = session_manager.logger
+
+SCALER_PORT = int(os.getenv('SCALER_PORT', 9090))
+SCALER_MAX_STREAMS = int(os.getenv('SCALER_MAX_STREAMS', 2000))  # One thread per StreamIsActive (per session)
+STREAM_RECHECK_SECONDS = int(os.getenv('STREAM_RECHECK_SECONDS', 30))  # Catch idle timeouts between pushes
+METRIC_NAME = 'session-activity'
+
+
+# ============================================================================
+# ACTIVITY WATCHER - Fan Redis activity notifications out to open streams
+# ============================================================================
+
+class ActivityWatcher:
+    """Wakes StreamIsActive handlers when session-manager publishes activity"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+
+    def subscribe(self, session_uuid):
+        event = threading.Event()
+        with self._lock:
+            self._waiters.setdefault(session_uuid, set()).add(event)
+        return event
+
+    def unsubscribe(self, session_uuid, event):
+        with self._lock:
+            waiters = self._waiters.get(session_uuid, set())
+            waiters.discard(event)
+            if not waiters:
+                self._waiters.pop(session_uuid, None)
+
+    def notify(self, session_uuid):
+        with self._lock:
+            for event in self._waiters.get(session_uuid, ()):
+                event.set()
+
+    def run(self):
+        """Listen on the scaler:activity channel, reconnecting on failure"""
+        while True:
+            try:
+                pubsub = session_manager.r.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe('scaler:activity')
+                logger.info("📡 Listening for session activity")
+                while True:
+                    # Short polls: a blocking listen() would trip the client's socket timeout
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self.notify(message['data'])
+            except Exception as e:
+                logger.warning(f"Activity subscription lost: {str(e)}")
+            time.sleep(5)
+
+
+watcher = ActivityWatcher()
+
+
+# ============================================================================
+# EXTERNAL SCALER SERVICE
+# ============================================================================
+
+def session_for(scaled_object):
+    """Session UUID from trigger metadata, falling back to the user-{uuid}-scaler name"""
+    session_uuid = scaled_object.scalerMetadata.get('sessionUuid')
+    if session_uuid:
+        return session_uuid
+    return scaled_object.name.removeprefix('user-').removesuffix('-scaler')
+
+
+class SessionScaler(pb_grpc.ExternalScalerServicer):
+    """Scale each user pod between 0 and 1 from its session activity"""
+
+    def IsActive(self, request, context):
+        activity = session_manager.session_activity(session_for(request))
+        return pb.IsActiveResponse(result=activity['active'])
+
+    def StreamIsActive(self, request, context):
+        """Push activity changes to KEDA as soon as session-manager publishes them"""
+        session_uuid = session_for(request)
+        wakeup = watcher.subscribe(session_uuid)
+        last = None
+        try:
+            while context.is_active():
+                try:
+                    active = session_manager.session_activity(session_uuid)['active']
+                except Exception as e:
+                    logger.warning(f"Activity lookup failed for {session_uuid}: {str(e)}")
+                    active = last
+                if active is not None and active != last:
+                    yield pb.IsActiveResponse(result=active)
+                    last = active
+                wakeup.wait(timeout=STREAM_RECHECK_SECONDS)
+                wakeup.clear()
+        finally:
+            watcher.unsubscribe(session_uuid, wakeup)
+
+    def GetMetricSpec(self, request, context):
+        return pb.GetMetricSpecResponse(metricSpecs=[
+            pb.MetricSpec(metricName=METRIC_NAME, targetSize=1)
+        ])
+
+    def GetMetrics(self, request, context):
+        # Pods never exceed 1 replica, so the value only needs to be >= 1 while active
+        activity = session_manager.session_activity(session_for(request.scaledObjectRef))
+        value = activity['pending'] + (1 if activity['active'] else 0)
+        return pb.GetMetricsResponse(metricValues=[
+            pb.MetricValue(metricName=METRIC_NAME, metricValue=value)
+        ])
+
+
+def serve():
+    threading.Thread(target=watcher.run, name='activity-watcher', daemon=True).start()
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=SCALER_MAX_STREAMS))
+    pb_grpc.add_ExternalScalerServicer_to_server(SessionScaler(), server)
+    server.add_insecure_port(f'[::]:{SCALER_PORT}')
+    server.start()
+    logger.info(f"🚀 KEDA external scaler listening on :{SCALER_PORT}")
+    server.wait_for_termination()
+
+
+def probe(session_uuid, address=f'localhost:{SCALER_PORT}'):
+    """Local stand-in for KEDA: query the scaler the way KEDA's operator does"""
+    ref = pb.ScaledObjectRef(name=f"user-{session_uuid}-scaler", scalerMetadata={'sessionUuid': session_uuid})
+    with grpc.insecure_channel(address) as channel:
+        stub = pb_grpc.ExternalScalerStub(channel)
+        print(f"IsActive:      {stub.IsActive(ref).result}")
+        print(f"GetMetricSpec: {stub.GetMetricSpec(ref).metricSpecs}")
+        print(f"GetMetrics:    {stub.GetMetrics(pb.GetMetricsRequest(scaledObjectRef=ref, metricName=METRIC_NAME)).metricValues}")
+        print("StreamIsActive (Ctrl-C to stop):")
+        for response in stub.StreamIsActive(ref):
+            print(f"  {time.strftime('%H:%M:%S')} active={response.result}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--probe':
+        probe(sys.argv[2])
+    else:
+        serve()